@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+# the loaders import pyplot at module level; keep the benchmark headless
+os.environ.setdefault("MPLBACKEND", "Agg")
+# every case measures real parsing, never the feather cache
+os.environ["EIA_CACHE_DISABLE"] = "1"
+
+import instrument
+import eia_layouts
+from eia_workbook import clear_grid_cache
+
+BENCH_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "bench")
+GENERATION_SERIES = ["Coal", "Natural gas", "Nuclear", "Hydroelectric", "Petroleum",
+                     "Non-hydro renewables", "Solar", "Wind", "Biomass and waste", "Geothermal"]
+CAPACITY_SERIES = ["Coal", "Natural Gas", "Oil", "Nuclear", "Hydro", "Solar", "Wind",
+                   "Storage", "Other", "Geothermal", "Biomass"]
+# (label, extra sheets, header offset, years, series, junk rows); offsets above 5 only
+# resolve through the headerless 0-15 scan, so both search paths are exercised
+CASES = [
+    ("small", 0, 0, 10, 6, 0),
+    ("offset-3", 1, 3, 10, 6, 20),
+    ("offset-12", 2, 12, 10, 6, 20),
+    ("wide", 2, 4, 40, 10, 50),
+    ("many-sheets", 12, 5, 20, 8, 100),
+    ("large", 6, 14, 35, 10, 800),
+]
+
+
+def _junk(r: random.Random) -> list:
+    return [r.choice([None, "notes", "units: TWh", r.uniform(0, 1e4)]) for _ in range(r.randint(1, 4))]
+
+
+def make_figure6_workbook(path: str, sheets: int, header_offset: int, years: int, series: int,
+                          junk_rows: int, seed: int = 0) -> None:
+    # figure6-style book: filler sheets, a tidy Year x series table below header_offset
+    # junk rows, and the wide "Generation" sheet the secondary loader reads
+    from openpyxl import Workbook
+
+    r = random.Random(seed)
+    wb = Workbook()
+    wb.remove(wb.active)
+    year_list = list(range(2000, 2000 + min(years, 36)))
+    names = GENERATION_SERIES[:series]
+    for i in range(sheets):
+        ws = wb.create_sheet(f"Notes {i + 1}")
+        for _ in range(junk_rows + 5):
+            ws.append(_junk(r))
+    ws = wb.create_sheet("Data")
+    for _ in range(header_offset):
+        ws.append([r.choice(["Figure 6", "Source: EIA", None])])
+    ws.append(["Year"] + names)
+    for y in year_list:
+        ws.append([y] + [round(r.uniform(0, 5000), 2) for _ in names])
+    for _ in range(junk_rows):
+        ws.append(_junk(r))
+    ws = wb.create_sheet("Generation")
+    for _ in range(min(header_offset, 20)):
+        ws.append([r.choice(["title", None, "units: TWh"])])
+    ws.append(["Source"] + year_list)
+    for name in names:
+        ws.append([name] + [round(r.uniform(0, 5000), 2) for _ in year_list])
+    wb.save(path)
+
+
+def make_figure7_workbook(path: str, sheets: int, header_offset: int, years: int, series: int,
+                          junk_rows: int, seed: int = 0) -> None:
+    # figure7-style book: Year x capacity-source table ending in 2024; the capacity
+    # loader only scans header rows 0-5, so the offset is clamped there
+    from openpyxl import Workbook
+
+    r = random.Random(seed)
+    wb = Workbook()
+    wb.remove(wb.active)
+    names = CAPACITY_SERIES[:max(series, 4)]
+    for i in range(sheets):
+        ws = wb.create_sheet(f"Notes {i + 1}")
+        for _ in range(junk_rows + 5):
+            ws.append(_junk(r))
+    ws = wb.create_sheet("Capacity")
+    for _ in range(min(header_offset, 5)):
+        ws.append([r.choice(["Figure 7", None])])
+    ws.append(["Year"] + names)
+    for y in range(2025 - years, 2025):
+        ws.append([y] + [round(r.uniform(0, 1500), 1) for _ in names])
+    wb.save(path)
+
+
+def workbook_cells(path: str) -> int:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        return sum(ws.max_row * ws.max_column for ws in wb.worksheets)
+    finally:
+        wb.close()
+
+
+def _rss_run(fn, arg, replay: bool, registry_path: str) -> int:
+    # peak RSS (kB) of one cold or replay call in a freshly spawned interpreter, imports included
+    eia_layouts.REGISTRY_PATH = registry_path
+    if not replay and os.path.exists(registry_path):
+        os.remove(registry_path)
+    fn(arg)
+    return instrument.peak_rss_kb()
+
+
+def measure(fn, arg, repeat: int, replay: bool = False) -> dict:
+    # cold runs drop the parsed grids and the layout registry first; replay runs keep the
+    # registry entry a cold run recorded, which is what a second build of the same workbook sees
+    def prepare():
+        clear_grid_cache()
+        if not replay and os.path.exists(eia_layouts.REGISTRY_PATH):
+            os.remove(eia_layouts.REGISTRY_PATH)
+        instrument.reset()
+
+    times = []
+    for _ in range(repeat):
+        prepare()
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    counters = instrument.counters()
+    # allocation tracing slows openpyxl several-fold, so memory gets its own untimed run
+    prepare()
+    tracemalloc.start()
+    fn(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # ru_maxrss only ever grows, so in this process it would repeat the largest earlier case;
+    # each case's RSS comes from its own spawned process instead
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        peak_rss = pool.submit(_rss_run, fn, arg, replay, eia_layouts.REGISTRY_PATH).result()
+    return {
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "peak_alloc_bytes": peak,
+        "peak_rss_kb": peak_rss,
+        "workbook_parses": counters.get("workbook.parses", 0),
+        "header_attempts": counters.get("header.attempts", 0),
+    }
+
+
+def run(cases: list, repeat: int, workdir: str) -> list:
+    from create_eia_capacity_2024 import extract_2024_capacity, load_figure7_dataframe
+    from create_eia_generation_timeseries import build_dataframe_from_generation_sheet, load_figure6_dataframe
+
+    results = []
+    for label, sheets, offset, years, series, junk in cases:
+        fig6 = os.path.join(workdir, f"figure6-{label}.xlsx")
+        fig7 = os.path.join(workdir, f"figure7-{label}.xlsx")
+        make_figure6_workbook(fig6, sheets, offset, years, series, junk)
+        make_figure7_workbook(fig7, sheets, offset, years, series, junk)
+        df7 = load_figure7_dataframe(fig7)
+        targets = [
+            ("load_figure6_dataframe", load_figure6_dataframe, fig6, False),
+            ("load_figure6_dataframe (replay)", load_figure6_dataframe, fig6, True),
+            ("build_dataframe_from_generation_sheet", build_dataframe_from_generation_sheet, fig6, False),
+            ("load_figure7_dataframe", load_figure7_dataframe, fig7, False),
+            ("extract_2024_capacity", extract_2024_capacity, df7, False),
+        ]
+        for name, fn, arg, replay in targets:
+            stats = measure(fn, arg, repeat, replay)
+            path = arg if isinstance(arg, str) else fig7
+            cells = workbook_cells(path)
+            stats.update({
+                "case": label, "function": name, "sheets": sheets + 2 if path == fig6 else sheets + 1,
+                "header_offset": offset, "years": years, "series": series, "junk_rows": junk,
+                "cells": cells, "file_bytes": os.path.getsize(path),
+                "cells_per_second": cells / stats["seconds_min"] if stats["seconds_min"] else None,
+            })
+            results.append(stats)
+            print(f"{label:12s} {name:40s} {stats['seconds_min'] * 1e3:9.1f} ms "
+                  f"{stats['peak_alloc_bytes'] / 2**20:7.1f} MiB  {stats['peak_rss_kb'] / 1024:6.1f} MiB RSS  parses={stats['workbook_parses']} "
+                  f"attempts={stats['header_attempts']}")
+    return results
+
+
+def compare(results: list, baseline_path: str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["case"], r["function"]): r for r in json.load(f)["results"]}
+    print(f"\nvs {os.path.basename(baseline_path)} (min time ratio, <1 is faster):")
+    for r in results:
+        old = baseline.get((r["case"], r["function"]))
+        if old and old["seconds_min"]:
+            print(f"{r['case']:12s} {r['function']:40s} {r['seconds_min'] / old['seconds_min']:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EIA workbook loaders on synthetic workbooks (offline).")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the minimum is reported")
+    parser.add_argument("--case", action="append", help="only run these case labels (repeatable)")
+    parser.add_argument("--output", help="results file (default: data/bench/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="print time ratios against an earlier results file")
+    args = parser.parse_args()
+
+    cases = [c for c in CASES if not args.case or c[0] in args.case]
+    instrument.enable()
+    with tempfile.TemporaryDirectory() as workdir:
+        # a private layout registry, so the benchmark neither reads nor pollutes the real one
+        eia_layouts.REGISTRY_PATH = os.path.join(workdir, "layouts.json")
+        results = run(cases, args.repeat, workdir)
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = args.output or os.path.join(BENCH_DIR, f"{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"created": stamp, "python": platform.python_version(), "machine": platform.machine(),
+                   "repeat": args.repeat, "results": results}, f, indent=2)
+    print("Results saved to:", output)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
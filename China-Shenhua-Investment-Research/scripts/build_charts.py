@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPTS_DIR)
+REPO_DIR = os.path.dirname(PROJECT_DIR)
+IMAGES_DIR = os.path.join(PROJECT_DIR, "01-industry", "images")
+EIA_DIR = os.path.join(PROJECT_DIR, "data", "eia")
+STATE_PATH = os.path.join(PROJECT_DIR, "data", "cache", "build_state.json")
+
+# shared modules every EIA chart goes through
+EIA_MODULES = [os.path.join(SCRIPTS_DIR, m) for m in
+               ("eia_workbook.py", "eia_cache.py", "eia_layouts.py", "eia_fetch.py", "eia_vault.py",
+                "instrument.py", "chart_render.py", "series_aliases.py")]
+
+
+def _script(name: str) -> str:
+    return os.path.join(SCRIPTS_DIR, name)
+
+
+def chart_nodes() -> list:
+    # every rendered chart: the command producing it, the files it reads and the files it writes
+    return [
+        {
+            # both locales of the coal-demand pie come from one spec in one render pass;
+            # outputs are relative to the repository root
+            "name": "coal_demand_sources",
+            "command": [_script("render_chart_spec.py"),
+                        os.path.join(PROJECT_DIR, "charts", "coal_demand_sources.json")],
+            "cwd": REPO_DIR,
+            "inputs": [_script("render_chart_spec.py"), _script("cjk_fonts.py"),
+                       os.path.join(PROJECT_DIR, "charts", "coal_demand_sources.json")],
+            "outputs": [os.path.join(REPO_DIR, "01-industry", "images", "coal_demand_sources.png"),
+                        os.path.join(REPO_DIR, "01-industry", "images", "coal_demand_sources_cn.png")],
+            "params": {},
+        },
+        {
+            "name": "generation_timeseries",
+            "command": [_script("create_eia_generation_timeseries.py")],
+            "cwd": PROJECT_DIR,
+            "inputs": [_script("create_eia_generation_timeseries.py"),
+                       os.path.join(EIA_DIR, "figure6_data.xlsx")] + EIA_MODULES,
+            "outputs": [os.path.join(IMAGES_DIR, "china_electricity_generation_timeseries_2014_2023.png")],
+            "params": {"dpi": 200},
+        },
+        {
+            "name": "capacity_2024",
+            "command": [_script("create_eia_capacity_2024.py")],
+            "cwd": PROJECT_DIR,
+            "inputs": [_script("create_eia_capacity_2024.py"),
+                       os.path.join(EIA_DIR, "figure7_data.xlsx")] + EIA_MODULES,
+            "outputs": [os.path.join(IMAGES_DIR, "china_installed_generation_capacity_2024.png")],
+            "params": {"dpi": 200},
+        },
+        {
+            "name": "generation_pie_2023",
+            "command": [_script("create_generation_pie_2023.py")],
+            "cwd": PROJECT_DIR,
+            "inputs": [_script("create_generation_pie_2023.py"), _script("cjk_fonts.py"),
+                       _script("create_eia_generation_timeseries.py"),
+                       os.path.join(EIA_DIR, "figure6_data.xlsx")] + EIA_MODULES,
+            "outputs": [os.path.join(IMAGES_DIR, "china_electricity_generation_2023.png"),
+                        os.path.join(IMAGES_DIR, "china_electricity_generation_2023_cn.png")],
+            "params": {"dpi": 300, "year": 2023},
+        },
+    ]
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        state = {}
+    state.setdefault("files", {})
+    state.setdefault("nodes", {})
+    return state
+
+
+def save_state(state: dict) -> None:
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(STATE_PATH), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+
+def file_digest(path: str, state: dict) -> str:
+    # content hash, recomputed only when the file's mtime or size moved
+    st = os.stat(path)
+    cached = state["files"].get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    state["files"][path] = [st.st_mtime_ns, st.st_size, h.hexdigest()]
+    return h.hexdigest()
+
+
+def node_stamp(node: dict, state: dict) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([node["command"], node["params"]], sort_keys=True).encode("utf-8"))
+    for path in sorted(node["inputs"]):
+        h.update(path.encode("utf-8"))
+        h.update(file_digest(path, state).encode("ascii"))
+    return h.hexdigest()
+
+
+def is_stale(node: dict, state: dict) -> bool:
+    if any(not os.path.exists(p) for p in node["outputs"]):
+        return True
+    return state["nodes"].get(node["name"]) != node_stamp(node, state)
+
+
+def dependencies(nodes: list) -> dict:
+    # a node depends on whichever node writes one of its inputs
+    producers = {out: n["name"] for n in nodes for out in n["outputs"]}
+    return {n["name"]: {producers[i] for i in n["inputs"] if i in producers} for n in nodes}
+
+
+def run_node(node: dict) -> tuple:
+    env = dict(os.environ, MPLBACKEND="Agg", EIA_SKIP_FETCH="1")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable] + node["command"], cwd=node["cwd"], env=env,
+                          capture_output=True, text=True)
+    return proc.returncode, proc.stdout + proc.stderr, time.perf_counter() - start
+
+
+def build(targets: list = None, force: bool = False, jobs: int = None, dry_run: bool = False) -> bool:
+    nodes = chart_nodes()
+    if targets:
+        unknown = set(targets) - {n["name"] for n in nodes}
+        if unknown:
+            raise SystemExit(f"Unknown targets: {', '.join(sorted(unknown))}")
+        nodes = [n for n in nodes if n["name"] in targets]
+    by_name = {n["name"]: n for n in nodes}
+    deps = dependencies(nodes)
+    state = load_state()
+
+    # decide what to run; a missing input fails that node only
+    pending, failed = {}, set()
+    for node in nodes:
+        missing = [p for p in node["inputs"] if not os.path.exists(p)]
+        if missing:
+            print(f"  fail  {node['name']}: missing input {missing[0]}")
+            failed.add(node["name"])
+        elif force or is_stale(node, state):
+            pending[node["name"]] = deps[node["name"]]
+        else:
+            print(f"    ok  {node['name']}")
+    if dry_run:
+        for name in pending:
+            print(f" stale  {name}")
+        save_state(state)
+        return not failed
+
+    done = set(by_name) - set(pending) - failed
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        running = {}
+        while pending or running:
+            for name in [n for n, d in pending.items() if d <= done]:
+                del pending[name]
+                running[pool.submit(run_node, by_name[name])] = name
+            for name in [n for n, d in pending.items() if d & failed]:
+                del pending[name]
+                failed.add(name)
+                print(f"  skip  {name}: dependency failed")
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                code, output, elapsed = fut.result()
+                if code == 0:
+                    # stamp after the run: the command may have refreshed one of its inputs
+                    state["nodes"][name] = node_stamp(by_name[name], state)
+                    done.add(name)
+                    print(f" built  {name} ({elapsed:.1f}s)")
+                else:
+                    failed.add(name)
+                    print(f"  fail  {name} (exit {code})\n{output.rstrip()}")
+    save_state(state)
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render research charts whose inputs changed.")
+    parser.add_argument("targets", nargs="*", help="node names (default: all)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="parallel renders (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="only report stale nodes")
+    parser.add_argument("--list", action="store_true", help="list nodes and their outputs")
+    args = parser.parse_args()
+    if args.list:
+        for node in chart_nodes():
+            print(node["name"])
+            for out in node["outputs"]:
+                print("   ", os.path.relpath(out, REPO_DIR))
+        return
+    if not build(args.targets, force=args.force, jobs=args.jobs, dry_run=args.dry_run):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+# Figure + FigureCanvasAgg only: no pyplot state machine, no backend selection
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+SERIES_ORDER = ["coal", "natural_gas", "nuclear", "hydro", "non_hydro_renewables", "petroleum"]
+SERIES_COLORS = {
+    "coal": "#2C3E50",
+    "natural_gas": "#C0392B",
+    "nuclear": "#F1C40F",
+    "hydro": "#2980B9",
+    "non_hydro_renewables": "#27AE60",
+    "petroleum": "#7F8C8D",
+}
+SERIES_LABELS = {
+    "coal": "Coal",
+    "natural_gas": "Natural Gas",
+    "nuclear": "Nuclear",
+    "hydro": "Hydropower",
+    "non_hydro_renewables": "Non-hydro Renewables",
+    "petroleum": "Petroleum & Other Liquids",
+}
+CAPACITY_ORDER = ["coal", "natural_gas", "nuclear", "hydro", "wind", "solar", "storage", "oil", "other"]
+CAPACITY_COLORS = {
+    "coal": "#2C3E50",
+    "natural_gas": "#C0392B",
+    "nuclear": "#F1C40F",
+    "hydro": "#2980B9",
+    "wind": "#16A085",
+    "solar": "#F39C12",
+    "storage": "#8E44AD",
+    "oil": "#7F8C8D",
+    "other": "#95A5A6",
+}
+CAPACITY_LABELS = {
+    "coal": "Coal",
+    "natural_gas": "Natural Gas",
+    "nuclear": "Nuclear",
+    "hydro": "Hydropower",
+    "wind": "Wind",
+    "solar": "Solar",
+    "storage": "Storage",
+    "oil": "Oil/Petroleum",
+    "other": "Other",
+}
+FOOTER = "Data source: U.S. EIA – {workbook} (retrieved)\n{source_url}"
+
+# one styled figure per template per process; jobs only add and later remove their data artists
+_TEMPLATES = {}
+
+
+def _new_template(kind: str) -> dict:
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if kind == "timeseries":
+        ax.set_xlabel("Year")
+        ax.set_ylabel("Generation (TWh)")
+        ax.grid(True, alpha=0.3, linestyle="--")
+    elif kind == "bars":
+        ax.set_ylabel("Capacity (GW)")
+        ax.grid(axis="y", alpha=0.3, linestyle="--")
+    else:
+        raise ValueError(f"Unknown chart template: {kind}")
+    footer = fig.text(0.5, 0.01, "", ha="center", fontsize=9, color="#555555")
+    return {"fig": fig, "ax": ax, "footer": footer}
+
+
+def template(kind: str) -> dict:
+    if kind not in _TEMPLATES:
+        _TEMPLATES[kind] = _new_template(kind)
+    return _TEMPLATES[kind]
+
+
+def _clear(t: dict) -> None:
+    # back to the bare styled template for the next job
+    ax = t["ax"]
+    for artist in list(ax.lines) + list(ax.patches) + list(ax.texts):
+        artist.remove()
+    ax.containers.clear()
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
+    ax.relim()
+
+
+def _save(t: dict, output_path: str, dpi: int) -> None:
+    fig = t["fig"]
+    # tight_layout only looks at the axes, so the footer stays where figtext always put it
+    fig.tight_layout()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    fig.savefig(output_path, dpi=dpi)
+
+
+def render_timeseries(year, series: dict, output_path: str, title: str, source_url: str,
+                      workbook: str = "figure6_data.xlsx", dpi: int = 200) -> str:
+    # series: key -> values aligned with year; unknown keys are ignored
+    t = template("timeseries")
+    ax = t["ax"]
+    try:
+        plotted_any = False
+        for key in SERIES_ORDER:
+            if key in series:
+                ax.plot(year, series[key], label=SERIES_LABELS[key], color=SERIES_COLORS[key], linewidth=2)
+                plotted_any = True
+        ax.set_title(title, pad=14)
+        if plotted_any:
+            ax.legend(loc="upper left", frameon=False)
+        ax.autoscale_view()
+        t["footer"].set_text(FOOTER.format(workbook=workbook, source_url=source_url))
+        _save(t, output_path, dpi)
+    finally:
+        _clear(t)
+    return output_path
+
+
+def render_bars(values: dict, output_path: str, title: str, source_url: str,
+                workbook: str = "figure7_data.xlsx", dpi: int = 200) -> str:
+    # values: capacity source -> GW, drawn in CAPACITY_ORDER
+    t = template("bars")
+    ax = t["ax"]
+    try:
+        keys = [k for k in CAPACITY_ORDER if k in values]
+        vals = [values[k] for k in keys]
+        positions = range(len(keys))
+        # numeric positions with explicit tick labels: a categorical axis would remember
+        # every earlier job's categories on a reused figure
+        ax.bar(positions, vals, color=[CAPACITY_COLORS[k] for k in keys])
+        ax.set_xticks(positions, [CAPACITY_LABELS[k] for k in keys], rotation=30, ha="right")
+        ax.set_title(title, pad=14)
+        for i, v in enumerate(vals):
+            ax.text(i, v, f"{v:.0f}", ha="center", va="bottom", fontsize=9)
+        ax.autoscale_view()
+        t["footer"].set_text(FOOTER.format(workbook=workbook, source_url=source_url))
+        _save(t, output_path, dpi)
+    finally:
+        _clear(t)
+    return output_path
+
+
+def render_job(job: dict) -> dict:
+    # one chart; failures are reported, never raised, so a batch carries on
+    result = {"kind": job.get("kind"), "output": job.get("output")}
+    start = time.perf_counter()
+    try:
+        kind = job["kind"]
+        if kind == "timeseries":
+            render_timeseries(job["year"], job["series"], job["output"], job["title"], job["source_url"],
+                              **{k: job[k] for k in ("workbook", "dpi") if k in job})
+        elif kind == "bars":
+            render_bars(job["values"], job["output"], job["title"], job["source_url"],
+                        **{k: job[k] for k in ("workbook", "dpi") if k in job})
+        elif kind == "spec":
+            from render_chart_spec import load_spec, render_spec
+
+            spec = job["spec"] if isinstance(job["spec"], dict) else load_spec(job["spec"])
+            result["output"] = render_spec(spec, job.get("locales"), job.get("out_root", "."))
+        else:
+            raise ValueError(f"Unknown chart job kind: {kind}")
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def warm() -> None:
+    # pool initializer: fonts, text layout and both templates are ready before the first job
+    for kind in ("timeseries", "bars"):
+        t = template(kind)
+        t["fig"].canvas.draw()
+
+
+def render_batch(jobs: list, workers: int = None, chunksize: int = 4) -> list:
+    # results come back in job order
+    if workers == 1 or len(jobs) <= 1:
+        return [render_job(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm) as pool:
+        return list(pool.map(render_job, jobs, chunksize=chunksize))
+
+
+def demo_jobs(n: int, out_dir: str) -> list:
+    # synthetic timeseries and bar jobs, for timing the pool
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    years = list(range(2014, 2024))
+    jobs = []
+    for i in range(n):
+        if i % 2:
+            jobs.append({"kind": "bars", "output": os.path.join(out_dir, f"bars_{i}.png"),
+                         "values": {k: float(v) for k, v in zip(CAPACITY_ORDER, rng.uniform(10, 1200, 9))},
+                         "title": f"Demo Installed Capacity {i}", "source_url": "https://www.eia.gov/"})
+        else:
+            jobs.append({"kind": "timeseries", "output": os.path.join(out_dir, f"timeseries_{i}.png"), "year": years,
+                         "series": {k: rng.uniform(100, 5000, len(years)).tolist() for k in SERIES_ORDER},
+                         "title": f"Demo Electricity Generation {i}", "source_url": "https://www.eia.gov/"})
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render batches of charts on a pool of warm Agg workers.")
+    parser.add_argument("jobs", nargs="?", help="JSON file holding a list of chart jobs")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: CPU count)")
+    parser.add_argument("--demo", type=int, metavar="N", help="render N synthetic charts into a temp dir and report timing")
+    args = parser.parse_args()
+    if args.demo:
+        with tempfile.TemporaryDirectory() as out_dir:
+            jobs = demo_jobs(args.demo, out_dir)
+            start = time.perf_counter()
+            results = render_batch(jobs, args.workers)
+            wall = time.perf_counter() - start
+    elif args.jobs:
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            jobs = json.load(f)
+        start = time.perf_counter()
+        results = render_batch(jobs, args.workers)
+        wall = time.perf_counter() - start
+    else:
+        parser.error("give a jobs file or --demo N")
+    failed = [r for r in results if r["status"] != "ok"]
+    for r in failed:
+        print(f"error  {r['output']}  ({r['error']})")
+    per_chart = sum(r["seconds"] for r in results) / max(len(results), 1)
+    print(f"{len(results) - len(failed)}/{len(results)} charts in {wall:.2f}s "
+          f"({per_chart * 1e3:.0f} ms draw per chart, {os.cpu_count()} CPUs)")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import argparse
+import importlib
+import json
+import os
+import re
+import sys
+import time
+import traceback
+
+import build_charts
+from build_charts import EIA_DIR, PROJECT_DIR, REPO_DIR, SCRIPTS_DIR
+
+# Long-running counterpart of build_charts: one process keeps pandas, matplotlib, the parsed
+# workbook grids and the chart templates loaded, polls the scripts, data and chart specs, and
+# re-renders only the charts a change affects. Edited scripts are reloaded in place together with
+# every local module that imports them, so a palette tweak in chart_render re-renders from the
+# already-parsed tables.
+
+POLL_INTERVAL = 0.02
+DEBOUNCE = 0.05     # quiet period that ends a burst of events (editor save, unzip, git checkout)
+MAX_WAIT = 0.5      # ...but never hold a batch longer than this
+WATCH_DIRS = {SCRIPTS_DIR: (".py",), EIA_DIR: (".xlsx",), os.path.join(PROJECT_DIR, "charts"): (".json",)}
+SELF = {"chart_watch", "shenhua_research"}  # entry points; never reloaded under the running loop
+_IMPORT = re.compile(r"^\s*(?:from|import)\s+(\w+)", re.M)
+
+_tables = {}
+
+
+def snapshot() -> dict:
+    # path -> (mtime_ns, size) of every watched file; editor temp and Office lock files are skipped
+    files = {}
+    for root_dir, suffixes in WATCH_DIRS.items():
+        for root, dirs, names in os.walk(root_dir):
+            dirs[:] = [d for d in dirs if not d.startswith((".", "__"))]
+            for name in names:
+                if name.endswith(suffixes) and not name.startswith((".", "~$")):
+                    path = os.path.abspath(os.path.join(root, name))
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files[path] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def changed_files(before: dict, after: dict) -> set:
+    return {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+
+
+def import_graph() -> dict:
+    # local module -> local modules it imports (function-level imports included)
+    local = {n[:-3] for n in os.listdir(SCRIPTS_DIR) if n.endswith(".py")}
+    graph = {}
+    for name in local:
+        with open(os.path.join(SCRIPTS_DIR, name + ".py"), "r", encoding="utf-8") as f:
+            graph[name] = set(_IMPORT.findall(f.read())) & local - {name}
+    return graph
+
+
+def closure(names: set, graph: dict) -> set:
+    # names plus everything they import, transitively
+    seen, stack = set(), list(names)
+    while stack:
+        name = stack.pop()
+        if name not in seen:
+            seen.add(name)
+            stack.extend(graph.get(name, ()))
+    return seen
+
+
+def reload_modules(changed: set, graph: dict) -> None:
+    # reload the edited modules and every loaded module importing them, dependencies first,
+    # so from-imports in the dependents pick up the new objects
+    stale = {m for m in graph if m in sys.modules and m not in SELF and closure({m}, graph) & changed}
+    done = set()
+    while stale - done:
+        ready = sorted(m for m in stale - done if not (graph[m] & stale) - done - {m})
+        for name in ready or sorted(stale - done):
+            importlib.reload(sys.modules[name])
+            done.add(name)
+
+
+def table(kind: str, xlsx_path: str, loader):
+    # tidy table for one workbook, recomputed when the file or the loader function changes;
+    # the openpyxl grids underneath stay cached in eia_workbook between reloads of the loader
+    st = os.stat(xlsx_path)
+    key = (kind, os.path.realpath(xlsx_path))
+    stamp = (st.st_mtime_ns, st.st_size, loader)
+    cached = _tables.get(key)
+    if cached is None or cached[0] != stamp:
+        cached = _tables[key] = (stamp, loader(xlsx_path))
+    return cached[1]
+
+
+def render_coal_demand_sources(node: dict) -> None:
+    m = importlib.import_module("render_chart_spec")
+    m.render_spec(m.load_spec(node["inputs"][-1]), None, REPO_DIR)
+
+
+def render_generation_timeseries(node: dict) -> None:
+    m = importlib.import_module("create_eia_generation_timeseries")
+    df = table("figure6", os.path.join(EIA_DIR, "figure6_data.xlsx"), m.load_generation_table)
+    m.plot_timeseries(df, {k: k for k in df.columns}, node["outputs"][0])
+
+
+def render_capacity_2024(node: dict) -> None:
+    m = importlib.import_module("create_eia_capacity_2024")
+    t = table("figure7", os.path.join(EIA_DIR, "figure7_data.xlsx"), m.load_capacity_table)
+    m.plot_capacity_bars(m.capacity_series(t), node["outputs"][0])
+
+
+def render_generation_pie_2023(node: dict) -> None:
+    gen = importlib.import_module("create_eia_generation_timeseries")
+    m = importlib.import_module("create_generation_pie_2023")
+    df = table("figure6", os.path.join(EIA_DIR, "figure6_data.xlsx"), gen.load_generation_table)
+    values = m.generation_shares(df, node["params"].get("year", m.YEAR))
+    for locale in sorted(m.LOCALES):
+        m.plot_generation_pie(values, locale, node["params"].get("year", m.YEAR))
+
+
+# in-process equivalent of each build_charts node's command
+RENDERERS = {
+    "coal_demand_sources": render_coal_demand_sources,
+    "generation_timeseries": render_generation_timeseries,
+    "capacity_2024": render_capacity_2024,
+    "generation_pie_2023": render_generation_pie_2023,
+}
+
+
+def warm(nodes: list) -> None:
+    names = {n["name"] for n in nodes}
+    gen = os.path.join(EIA_DIR, "figure6_data.xlsx")
+    if names & {"generation_timeseries", "generation_pie_2023"} and os.path.exists(gen):
+        table("figure6", gen, importlib.import_module("create_eia_generation_timeseries").load_generation_table)
+    cap = os.path.join(EIA_DIR, "figure7_data.xlsx")
+    if "capacity_2024" in names and os.path.exists(cap):
+        table("figure7", cap, importlib.import_module("create_eia_capacity_2024").load_capacity_table)
+    importlib.import_module("chart_render").warm()
+
+
+def node_modules(node: dict, graph: dict) -> set:
+    # local modules a node's output depends on
+    scripts = {os.path.basename(p)[:-3] for p in node["inputs"] if p.endswith(".py")}
+    return closure(scripts, graph)
+
+
+def affected(nodes: list, changed: set, changed_modules: set, graph: dict) -> list:
+    inputs_changed = {os.path.abspath(p) for p in changed}
+    return [n for n in nodes
+            if inputs_changed & {os.path.abspath(p) for p in n["inputs"]} or node_modules(n, graph) & changed_modules]
+
+
+def render_nodes(nodes: list, state: dict) -> None:
+    for node in nodes:
+        start = time.perf_counter()
+        try:
+            RENDERERS[node["name"]](node)
+        except Exception:
+            print(f"  fail  {node['name']}\n{traceback.format_exc().rstrip()}")
+            continue
+        # keep build_charts' record current so a later `build` does not redo this work
+        state["nodes"][node["name"]] = build_charts.node_stamp(node, state)
+        print(f" built  {node['name']} ({(time.perf_counter() - start) * 1e3:.0f} ms)")
+    build_charts.save_state(state)
+
+
+def wait_for_batch(files: dict) -> tuple:
+    # block until something changes, then until the burst settles; returns (new snapshot, changed paths)
+    while True:
+        time.sleep(POLL_INTERVAL)
+        current = snapshot()
+        changed = changed_files(files, current)
+        if changed:
+            break
+    first = last = time.perf_counter()
+    while time.perf_counter() - last < DEBOUNCE and time.perf_counter() - first < MAX_WAIT:
+        time.sleep(POLL_INTERVAL)
+        latest = snapshot()
+        more = changed_files(current, latest)
+        if more:
+            changed |= more
+            current, last = latest, time.perf_counter()
+    return current, changed
+
+
+def watch(targets: list = None) -> None:
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    names = set(targets or RENDERERS)
+    unknown = names - set(RENDERERS)
+    if unknown:
+        raise SystemExit(f"Unknown targets: {', '.join(sorted(unknown))}")
+    nodes = [n for n in build_charts.chart_nodes() if n["name"] in names]
+    graph = import_graph()
+    state = build_charts.load_state()
+
+    # warm start: import everything, parse the workbooks and build the figure templates once,
+    # then render only what is out of date
+    for name in sorted(closure({m for n in nodes for m in node_modules(n, graph)}, graph) - SELF):
+        importlib.import_module(name)
+    warm(nodes)
+    render_nodes([n for n in nodes if all(os.path.exists(p) for p in n["inputs"]) and build_charts.is_stale(n, state)], state)
+    files = snapshot()
+    print(f"Watching {len(files)} files for {', '.join(n['name'] for n in nodes)} (Ctrl-C to stop)")
+
+    while True:
+        files, changed = wait_for_batch(files)
+        started = time.perf_counter()
+        modules = {os.path.basename(p)[:-3] for p in changed if p.endswith(".py") and os.path.dirname(p) == SCRIPTS_DIR}
+        if modules:
+            graph = import_graph()
+            try:
+                reload_modules(modules, graph)
+            except Exception:
+                # typically a half-saved file; the next save triggers another attempt
+                print(f"  fail  reload {', '.join(sorted(modules))}\n{traceback.format_exc().rstrip()}")
+                continue
+        if "build_charts" in modules:
+            # node definitions (inputs, params) may have changed; re-render nodes whose definition did
+            old = {n["name"]: json.dumps(n, sort_keys=True) for n in nodes}
+            nodes = [n for n in build_charts.chart_nodes() if n["name"] in names]
+            redo = [n for n in nodes if old.get(n["name"]) != json.dumps(n, sort_keys=True)]
+        else:
+            redo = affected(nodes, changed, modules, graph)
+        redo = [n for n in redo if all(os.path.exists(p) for p in n["inputs"])]
+        if not redo:
+            continue
+        print(f"{len(changed)} changed file(s) -> {', '.join(n['name'] for n in redo)}"
+              f" (reloaded in {(time.perf_counter() - started) * 1e3:.0f} ms)")
+        render_nodes(redo, state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the EIA charts up to date while editing scripts, data or chart specs.")
+    parser.add_argument("targets", nargs="*", help="node names (default: all)")
+    args = parser.parse_args()
+    try:
+        watch(args.targets)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import json
+import os
+import warnings
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "cjk_font.json")
+# preferred families, most common first; the rest of the installed fonts are only scanned if none match
+CANDIDATES = [
+    "Arial Unicode MS", "SimHei", "PingFang SC", "Microsoft YaHei",
+    "Noto Sans CJK SC", "Noto Sans SC", "Source Han Sans SC", "Source Han Sans CN",
+    "WenQuanYi Zen Hei", "WenQuanYi Micro Hei", "Droid Sans Fallback", "AR PL UMing CN",
+]
+PROBE_TEXT = "中国煤炭电力需求"
+# fonts that "cover" everything by drawing placeholder boxes
+PLACEHOLDER_FONTS = ("Last Resort",)
+
+
+def _covers(path: str, text: str) -> bool:
+    return not missing_glyphs(text, path)
+
+
+def missing_glyphs(text: str, path: str) -> set:
+    from matplotlib.ft2font import FT2Font
+
+    font = FT2Font(path)
+    return {ch for ch in set(text) if not ch.isspace() and font.get_char_index(ord(ch)) == 0}
+
+
+def _probe() -> dict:
+    # one walk over matplotlib's font list; only runs when nothing valid is persisted
+    from matplotlib import font_manager
+
+    fonts = font_manager.fontManager.ttflist
+    by_name = {}
+    for f in fonts:
+        by_name.setdefault(f.name, f.fname)
+    for name in CANDIDATES:
+        path = by_name.get(name)
+        if path and _covers(path, PROBE_TEXT):
+            return {"name": name, "path": path}
+    for f in fonts:
+        if f.name.startswith(PLACEHOLDER_FONTS):
+            continue
+        try:
+            if _covers(f.fname, PROBE_TEXT):
+                return {"name": f.name, "path": f.fname}
+        except (OSError, RuntimeError):
+            continue
+    return {}
+
+
+def _load_cached() -> Optional[dict]:
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if cached.get("path") and not os.path.exists(cached["path"]):
+        return None
+    return cached
+
+
+@lru_cache(maxsize=1)
+def resolve_cjk_font() -> dict:
+    # {"name", "path"} of a CJK-capable font, or {} when the machine has none; persisted across runs
+    cached = _load_cached()
+    if cached is not None:
+        return cached
+    found = _probe()
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    with open(CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump(found, f, indent=2)
+    if not found:
+        print("Warning: no CJK-capable font installed; Chinese text will render as empty boxes. "
+              "Install e.g. Noto Sans CJK SC and delete", os.path.normpath(CACHE_PATH))
+    return found
+
+
+@lru_cache(maxsize=1)
+def cjk_family() -> list:
+    # family list for rcParams/set_fontfamily; the resolved file is registered directly,
+    # so drawing Chinese text never walks the font manager looking for fallbacks
+    from matplotlib import font_manager
+
+    font = resolve_cjk_font()
+    if not font:
+        return ["DejaVu Sans"]
+    if font["path"] not in {f.fname for f in font_manager.fontManager.ttflist}:
+        font_manager.fontManager.addfont(font["path"])
+    return [font["name"], "DejaVu Sans"]
+
+
+def installed_families(names: list) -> list:
+    # drop families matplotlib does not know, so text drawing never logs findfont fallbacks
+    from matplotlib import font_manager
+
+    known = {f.name for f in font_manager.fontManager.ttflist}
+    return [n for n in names if n in known] or ["DejaVu Sans"]
+
+
+def use_cjk_rcparams() -> None:
+    import matplotlib
+
+    matplotlib.rcParams['font.sans-serif'] = cjk_family()
+    matplotlib.rcParams['font.family'] = 'sans-serif'
+    matplotlib.rcParams['axes.unicode_minus'] = False
+
+
+def report_missing_glyphs(texts: list, context: str = "") -> set:
+    # checked before drawing, so missing characters are named instead of appearing as tofu
+    font = resolve_cjk_font()
+    text = "".join(texts)
+    if not font:
+        missing = {ch for ch in text if ord(ch) > 0x2E7F}
+    else:
+        missing = missing_glyphs(text, font["path"])
+    if missing:
+        where = f" in {context}" if context else ""
+        print(f"Warning: {len(missing)} characters{where} have no glyph in the CJK font: {''.join(sorted(missing))}")
+    return missing
+
+
+@contextmanager
+def summarised_glyph_warnings(missing: set):
+    # wrap the draw of text already checked by report_missing_glyphs: matplotlib would otherwise warn once
+    # per missing glyph, repeating the summary. Only this draw is affected; later figures still warn.
+    with warnings.catch_warnings():
+        if missing:
+            warnings.filterwarnings("ignore", message=r"Glyph \d+ .* missing from font")
+        yield
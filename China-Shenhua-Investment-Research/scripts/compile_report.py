@@ -0,0 +1,293 @@
+import argparse
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from build_charts import PROJECT_DIR, file_digest
+
+# Report sections in reading order, relative to the project directory
+SECTIONS = [
+    "README.md",
+    "01-industry/industry_demand.md",
+    "02-company/business_model.md",
+    "03-financials/key_drivers.md",
+    "04-valuation/dividend_logic.md",
+]
+OUT_DIR = os.path.join(PROJECT_DIR, "build", "report")
+STATE_PATH = os.path.join(PROJECT_DIR, "data", "cache", "report_state.json")
+FRAGMENT_DIR = os.path.join(PROJECT_DIR, "data", "cache", "report")
+
+# bump whenever the fragment HTML or the image variants change shape
+RENDER_VERSION = "3"
+WIDTHS = (480, 960, 1600)
+THUMB_WIDTH = 320
+WEBP_QUALITY = 82
+# third-party modules the compiler needs: import name -> pip package
+REQUIREMENTS = {"markdown": "markdown", "PIL": "Pillow"}
+
+_IMG = re.compile(r'<img alt="([^"]*)" src="([^"]+)"((?: [\w-]+="[^"]*")*) ?/?>')
+_HREF = re.compile(r'href="([^"#:]+\.md)(#[^"]*)?"')
+_TITLE = re.compile(r"^#\s+(.+?)\s*$", re.M)
+
+CSS = """
+body { font: 16px/1.6 -apple-system, "Segoe UI", "Noto Sans", "Noto Sans CJK SC", sans-serif; margin: 0; color: #222; }
+nav { position: fixed; top: 0; left: 0; width: 15rem; height: 100%; overflow: auto; padding: 1rem; background: #f6f7f9; box-sizing: border-box; }
+nav a { display: block; color: #2C3E50; text-decoration: none; margin: .4rem 0; }
+main { margin-left: 16rem; max-width: 54rem; padding: 1rem 2rem; }
+section + section { border-top: 1px solid #ddd; margin-top: 3rem; }
+picture img { max-width: 100%; height: auto; background-size: 100% 100%; background-repeat: no-repeat; }
+table { border-collapse: collapse; font-size: .9em; }
+th, td { border: 1px solid #ccc; padding: .3rem .6rem; }
+.missing-figure { color: #999; font-style: italic; }
+@media print { nav { display: none; } main { margin: 0; } }
+"""
+
+
+def section_id(path: str) -> str:
+    if os.path.basename(path) == "README.md":
+        return "overview"
+    return os.path.splitext(os.path.basename(path))[0].replace("_", "-")
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        state = {}
+    state.setdefault("files", {})
+    state.setdefault("images", {})
+    return state
+
+
+def _atomic_write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def image_refs(markdown_text: str, section_path: str) -> list:
+    # absolute paths of the local images a section embeds
+    base = os.path.dirname(section_path)
+    refs = re.findall(r"!\[[^\]]*\]\(([^)\s]+)", markdown_text)
+    return [os.path.normpath(os.path.join(base, r)) for r in refs if "://" not in r]
+
+
+def variant_names(src: str, digest: str, width: int) -> dict:
+    stem = f"{os.path.splitext(os.path.basename(src))[0]}-{digest[:12]}"
+    widths = sorted({w for w in WIDTHS if w < width} | {min(width, WIDTHS[-1])})
+    return {
+        "webp": [(w, f"{stem}-{w}.webp") for w in widths],
+        "fallback": f"{stem}-{widths[-1]}.png",
+        "thumb": f"{stem}-thumb.webp",
+    }
+
+
+def make_variants(task: tuple) -> dict:
+    # responsive WebP sizes, a thumbnail and a palette PNG fallback for one source image
+    from PIL import Image
+
+    src, digest, out_dir = task
+    os.makedirs(out_dir, exist_ok=True)
+    with Image.open(src) as im:
+        im = im.convert("RGBA" if "A" in im.getbands() or "transparency" in im.info else "RGB")
+        width, height = im.size
+        names = variant_names(src, digest, width)
+
+        def save(img, name, **kwargs):
+            fd, tmp = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+            os.close(fd)
+            img.save(tmp, **kwargs)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, os.path.join(out_dir, name))
+
+        def scaled(w):
+            return im if w == width else im.resize((w, max(round(height * w / width), 1)), Image.LANCZOS)
+
+        for w, name in names["webp"]:
+            save(scaled(w), name, format="WEBP", quality=WEBP_QUALITY, method=6)
+        save(scaled(THUMB_WIDTH if THUMB_WIDTH < width else width), names["thumb"], format="WEBP", quality=WEBP_QUALITY)
+        # charts are flat colours plus anti-aliasing; a 256-colour palette keeps them sharp at a fraction of the size
+        fallback = scaled(names["webp"][-1][0])
+        save(fallback.quantize(256, method=Image.Quantize.FASTOCTREE), names["fallback"], format="PNG", optimize=True)
+    return dict(names, width=width, height=height, version=RENDER_VERSION)
+
+
+def picture_html(alt: str, record: dict, attrs: str = "") -> str:
+    # <picture> with a WebP srcset; browsers pick the smallest size that fits, PDF renderers use the PNG.
+    # The thumbnail is the <img> background, so a blurred preview shows while the lazy image loads.
+    srcset = ", ".join(f"assets/{name} {w}w" for w, name in record["webp"])
+    largest = record["webp"][-1][0]
+    h = round(record["height"] * largest / record["width"])
+    return (f'<a href="assets/{record["webp"][-1][1]}"><picture>'
+            f'<source type="image/webp" srcset="{srcset}" sizes="(max-width: 60rem) 100vw, 50rem">'
+            f'<img alt="{alt}" src="assets/{record["fallback"]}" width="{largest}" height="{h}" loading="lazy" decoding="async"{attrs} '
+            f'style="background-image: url(assets/{record["thumb"]})">'
+            f'</picture></a>')
+
+
+def render_section(path: str, text: str, images: dict) -> str:
+    # one section as an HTML fragment: images become <picture> elements, links to other sections anchors
+    import markdown
+
+    body = markdown.markdown(text, extensions=["tables", "sane_lists"])
+    base = os.path.dirname(path)
+    anchors = {os.path.normpath(os.path.join(PROJECT_DIR, s)): section_id(s) for s in SECTIONS}
+
+    def image(m):
+        src = os.path.normpath(os.path.join(base, html.unescape(m.group(2))))
+        record = images.get(src)
+        if record is None:
+            return f'<span class="missing-figure">[{m.group(1)}]</span>'
+        return picture_html(m.group(1), record, m.group(3))
+
+    def link(m):
+        target = anchors.get(os.path.normpath(os.path.join(base, m.group(1))))
+        return f'href="#{target}"' if target else m.group(0)
+
+    body = _HREF.sub(link, _IMG.sub(image, body))
+    return f'<section id="{section_id(path)}">\n{body}\n</section>'
+
+
+def fragment_key(path: str, text: str, images: dict) -> str:
+    h = hashlib.sha256(RENDER_VERSION.encode("ascii"))
+    h.update(os.path.relpath(path, PROJECT_DIR).encode("utf-8"))
+    h.update(text.encode("utf-8"))
+    for src in sorted(images):
+        h.update(json.dumps([os.path.relpath(src, PROJECT_DIR), images[src]], sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def check_requirements(pdf: bool = False) -> None:
+    # fail before any output is written, naming what to install
+    needed = dict(REQUIREMENTS, **({"weasyprint": "weasyprint"} if pdf else {}))
+    missing = sorted(pkg for mod, pkg in needed.items() if importlib.util.find_spec(mod) is None)
+    if missing:
+        raise SystemExit(f"compile_report needs {', '.join(missing)}: pip install {' '.join(missing)}")
+
+
+def compile_report(out_dir: str = OUT_DIR, jobs: int = None, force: bool = False, pdf: bool = False) -> dict:
+    check_requirements(pdf)
+    start = time.perf_counter()
+    state = load_state()
+    assets = os.path.join(out_dir, "assets")
+    sections, missing = [], []
+    for rel in SECTIONS:
+        path = os.path.join(PROJECT_DIR, rel)
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        refs = image_refs(text, path)
+        missing += [src for src in refs if not os.path.exists(src)]
+        sections.append((path, text, [src for src in refs if os.path.exists(src)]))
+
+    # image variants: content-addressed, so only new or changed images go to the pool
+    digests = {src: file_digest(src, state) for _, _, refs in sections for src in refs}
+    records, tasks = {}, []
+    for src, digest in digests.items():
+        record = state["images"].get(digest)
+        names = [] if record is None else [n for _, n in record["webp"]] + [record["fallback"], record["thumb"]]
+        if force or record is None or record.get("version") != RENDER_VERSION or \
+                not all(os.path.exists(os.path.join(assets, n)) for n in names):
+            tasks.append((src, digest, assets))
+        else:
+            records[src] = record
+    if len(tasks) > 1 and (jobs is None or jobs > 1):
+        with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(tasks))) as pool:
+            done = list(pool.map(make_variants, tasks))
+    else:
+        done = [make_variants(t) for t in tasks]
+    for (src, digest, _), record in zip(tasks, done):
+        state["images"][digest] = records[src] = record
+
+    # sections: a fragment is reused while its text, its images and the renderer are unchanged
+    fragments, keys, rebuilt = [], set(), 0
+    for path, text, refs in sections:
+        images = {src: records[src] for src in refs}
+        name = fragment_key(path, text, images) + ".html"
+        keys.add(name)
+        cache = os.path.join(FRAGMENT_DIR, name)
+        if not force and os.path.exists(cache):
+            with open(cache, "r", encoding="utf-8") as f:
+                fragments.append(f.read())
+            continue
+        fragment = render_section(path, text, images)
+        _atomic_write(cache, fragment)
+        fragments.append(fragment)
+        rebuilt += 1
+
+    titles = []
+    for rel, (_, text, _) in zip(SECTIONS, sections):
+        m = _TITLE.search(text)
+        titles.append((section_id(rel), m.group(1) if m else rel))
+    nav = "\n".join(f'<a href="#{sid}">{html.escape(title)}</a>' for sid, title in titles)
+    page = (f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            f'<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+            f'<title>{html.escape(titles[0][1])}</title>\n<style>{CSS}</style>\n</head>\n<body>\n'
+            f'<nav>\n{nav}\n</nav>\n<main>\n' + "\n".join(fragments) + "\n</main>\n</body>\n</html>\n")
+    index = os.path.join(out_dir, "index.html")
+    _atomic_write(index, page)
+
+    # drop fragments of earlier section versions and variants of images the report no longer uses
+    for name in os.listdir(FRAGMENT_DIR):
+        if name.endswith(".html") and name not in keys:
+            os.remove(os.path.join(FRAGMENT_DIR, name))
+    used = {n for r in records.values() for n in [n for _, n in r["webp"]] + [r["fallback"], r["thumb"]]}
+    if os.path.isdir(assets):
+        for name in os.listdir(assets):
+            if name not in used:
+                os.remove(os.path.join(assets, name))
+    state["images"] = {d: state["images"][d] for d in set(digests.values())}
+    _atomic_write(STATE_PATH, json.dumps(state, indent=2, sort_keys=True))
+
+    if pdf:
+        from weasyprint import HTML
+
+        HTML(filename=index).write_pdf(os.path.join(out_dir, "report.pdf"))
+
+    # payload: the page plus the one WebP a typical desktop browser picks per image
+    served = [next((n for w, n in r["webp"] if w >= 960), r["webp"][-1][1]) for r in records.values()]
+    return {
+        "index": index,
+        "sections": len(sections),
+        "sections_rebuilt": rebuilt,
+        "images": len(records),
+        "images_rebuilt": len(tasks),
+        "missing_images": missing,
+        "source_bytes": sum(os.path.getsize(src) for src in records),
+        "payload_bytes": len(page.encode("utf-8")) + sum(os.path.getsize(os.path.join(assets, n)) for n in served),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the research report into one HTML page with optimized images.")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="image workers (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rebuild every section and image")
+    parser.add_argument("--pdf", action="store_true", help="also write report.pdf (needs weasyprint)")
+    args = parser.parse_args()
+    r = compile_report(args.out_dir, jobs=args.jobs, force=args.force, pdf=args.pdf)
+    print(f"{r['sections_rebuilt']}/{r['sections']} sections and {r['images_rebuilt']}/{r['images']} images rebuilt "
+          f"in {r['elapsed'] * 1e3:.0f} ms")
+    print(f"Images: {r['source_bytes'] / 1024:,.0f} KiB of source PNG -> page payload {r['payload_bytes'] / 1024:,.0f} KiB")
+    for src in r["missing_images"]:
+        print("Missing image (shown as its alt text):", os.path.relpath(src, PROJECT_DIR))
+    print("Report saved to:", r["index"])
+
+
+if __name__ == "__main__":
+    main()
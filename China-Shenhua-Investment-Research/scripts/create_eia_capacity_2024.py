@@ -1,72 +1,29 @@
+import argparse
 import os
-import re
-import requests
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from chart_render import render_bars
+from eia_cache import load_cached
+from eia_fetch import download_excel
+from eia_vault import latest_path
+from eia_layouts import lookup, remember, workbook_fingerprint
+from instrument import count, enable, span
+from eia_workbook import frame_from_grid, read_sheet_grid, read_sheet_grids
+from series_aliases import CAPACITY, match_columns, year_column
 
 EIA_FIG7_URL = "https://www.eia.gov/international/content/analysis/countries_long/China/content/analysis/countries_long/China/excel/figure7_data.xlsx"
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "eia")
-ALT_DATA_DIR = "/Users/david.zhou/investment-research/China-Shenhua-Investment-Research/data/eia"
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "..", "01-industry", "images", "china_installed_generation_capacity_2024.png")
 
-KNOWN_CAPACITY = {
-    "coal": ["coal"],
-    "natural_gas": ["natural gas", "gas"],
-    "oil": ["oil", "petroleum"],
-    "nuclear": ["nuclear"],
-    "hydro": ["hydro", "hydropower", "hydroelectric"],
-    "solar": ["solar"],
-    "wind": ["wind"],
-    "storage": ["storage", "pumped-storage", "battery"],
-    "other": ["other"],
-}
-
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def download_excel(url: str, dest_path: str) -> None:
-    if os.path.exists(dest_path):
-        try:
-            with open(dest_path, "rb") as f:
-                head = f.read(2)
-            if head.startswith(b"PK"):
-                return
-            else:
-                os.remove(dest_path)
-        except Exception:
-            try:
-                os.remove(dest_path)
-            except Exception:
-                pass
-    ensure_dir(os.path.dirname(dest_path))
-    headers = {
-        "User-Agent": "Mozilla/5.0 (GitHub Copilot)",
-        "Accept": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet,application/octet-stream,*/*",
-        "Referer": "https://www.eia.gov/international/content/analysis/countries_long/China/",
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
-    content_type = resp.headers.get("content-type", "")
-    content = resp.content
-    if ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" not in content_type) and not content.startswith(b"PK"):
-        raise ValueError(f"Unexpected content type when downloading Excel: {content_type} status={resp.status_code}")
-    with open(dest_path, "wb") as f:
-        f.write(content)
-
-
-def normalize_col(name: str) -> str:
-    return re.sub(r"[^a-z]", "", name.strip().lower())
-
-
-def extract_2024_capacity(df: pd.DataFrame) -> pd.Series:
-    # locate a suitable row (prefer 2024, else last non-empty)
-    year_col = None
-    for c in df.columns:
-        if normalize_col(str(c)) in ("year", "years"):
-            year_col = c
-            break
+def capacity_row(df: pd.DataFrame) -> tuple:
+    # (row, year) of the capacity row to chart: 2024 if present, else the last non-empty row;
+    # year is None when the table has no usable year column
+    year_col = year_column(df.columns)
     df_work = df.dropna(how="all")
     if year_col is not None and year_col in df_work.columns:
         try:
@@ -78,110 +35,109 @@ def extract_2024_capacity(df: pd.DataFrame) -> pd.Series:
     else:
         df_year = df_work.tail(1)
     row = df_year.iloc[0]
-    # build capacity map; if columns are multiindex or odd headers, normalize
+    year = pd.to_numeric(row[year_col], errors="coerce") if year_col in df_work.columns else None
+    return row, (int(year) if year is not None and pd.notna(year) else None)
+
+
+def extract_2024_capacity(df: pd.DataFrame) -> pd.Series:
+    df_work = df.dropna(how="all")
+    row, _ = capacity_row(df)
+    # build capacity map: per source, the first alias whose (first matching) column holds a number
     values = {}
-    for key, cands in KNOWN_CAPACITY.items():
-        for cand in cands:
-            cand_norm = normalize_col(cand)
-            for col in df_work.columns:
-                try:
-                    col_norm = normalize_col(str(col))
-                except Exception:
-                    col_norm = normalize_col(str(col))
-                if col_norm == cand_norm:
-                    try:
-                        values[key] = float(row[col])
-                    except Exception:
-                        pass
-                    break
-            if key in values:
+    for key, cols in match_columns(df_work.columns, CAPACITY, keep="first").items():
+        for col in cols:
+            try:
+                values[key] = float(row[col])
                 break
+            except Exception:
+                pass
     return pd.Series(values)
 
 
+def figure7_candidate(rows: list, header_row: int) -> pd.DataFrame:
+    return frame_from_grid(rows, header=header_row).dropna(axis=1, how="all").dropna(how="all")
+
+
 def load_figure7_dataframe(xlsx_path: str) -> pd.DataFrame:
-    sheets = pd.read_excel(xlsx_path, sheet_name=None, engine="openpyxl")
-    for name in sheets.keys():
+    # a workbook whose structure was seen before goes straight to the recorded table
+    fingerprint = workbook_fingerprint(xlsx_path)
+    layout = lookup("figure7", fingerprint)
+    if layout is not None:
+        try:
+            df = figure7_candidate(read_sheet_grid(xlsx_path, layout["sheet"]), layout["header_row"])
+            if df.shape[1] > 0 and list(extract_2024_capacity(df).index) == layout["sources"]:
+                return df
+        except Exception:
+            count("figure7.swallowed_exceptions")
+        print("Recorded figure7 layout no longer matches; searching the workbook...")
+    sheets = read_sheet_grids(xlsx_path)
+    for name, rows in sheets.items():
         for header_row in range(0, 6):
             try:
-                df = pd.read_excel(xlsx_path, sheet_name=name, engine="openpyxl", header=header_row)
-                df = df.dropna(axis=1, how="all").dropna(how="all")
+                df = figure7_candidate(rows, header_row)
                 if df.shape[1] == 0:
                     continue
                 s = extract_2024_capacity(df)
                 if len(s) >= 4:  # at least a few sources found
+                    layout = {"sheet": name, "header_row": header_row, "sources": list(s.index)}
+                    try:
+                        remember("figure7", fingerprint, layout)
+                    except OSError as e:
+                        print("Could not record figure7 layout:", e)
                     return df
             except Exception:
+                count("figure7.swallowed_exceptions")
                 continue
-    return pd.read_excel(xlsx_path, sheet_name=0, engine="openpyxl")
-
-
-def plot_capacity_bars(series: pd.Series) -> None:
-    # order: coal, natural_gas, nuclear, hydro, wind, solar, storage, oil, other
-    order = ["coal", "natural_gas", "nuclear", "hydro", "wind", "solar", "storage", "oil", "other"]
-    labels_map = {
-        "coal": "Coal",
-        "natural_gas": "Natural Gas",
-        "nuclear": "Nuclear",
-        "hydro": "Hydropower",
-        "wind": "Wind",
-        "solar": "Solar",
-        "storage": "Storage",
-        "oil": "Oil/Petroleum",
-        "other": "Other",
-    }
-    colors = {
-        "coal": "#2C3E50",
-        "natural_gas": "#C0392B",
-        "nuclear": "#F1C40F",
-        "hydro": "#2980B9",
-        "wind": "#16A085",
-        "solar": "#F39C12",
-        "storage": "#8E44AD",
-        "oil": "#7F8C8D",
-        "other": "#95A5A6",
-    }
-    keys = [k for k in order if k in series.index]
-    vals = [series[k] for k in keys]
-    labels = [labels_map[k] for k in keys]
-    cols = [colors[k] for k in keys]
-
-    plt.figure(figsize=(10, 6))
-    plt.bar(labels, vals, color=cols)
-    plt.title("China Installed Generation Capacity by Source (2024)", pad=14)
-    plt.ylabel("Capacity (GW)")
-    plt.xticks(rotation=30, ha="right")
-    for i, v in enumerate(vals):
-        plt.text(i, v, f"{v:.0f}", ha="center", va="bottom", fontsize=9)
-    plt.grid(axis="y", alpha=0.3, linestyle="--")
-    plt.tight_layout()
-    plt.figtext(0.5, 0.01,
-                "Data source: U.S. EIA – figure7_data.xlsx (retrieved)\n"
-                f"{EIA_FIG7_URL}",
-                ha="center", fontsize=9, color="#555555")
-    ensure_dir(os.path.dirname(OUTPUT_PATH))
-    plt.savefig(OUTPUT_PATH, dpi=200)
-    plt.close()
+    return frame_from_grid(next(iter(sheets.values())), header=0)
+
+
+def load_capacity_table(xlsx_path: str) -> pd.DataFrame:
+    # tidy form of the capacity series, suitable for the parse cache; "year" is the row actually
+    # charted (2024 unless the workbook lacks it), NaN when the table has no year column
+    with span("figure7.locate_table"):
+        df = load_figure7_dataframe(xlsx_path)
+    with span("figure7.extract_2024_capacity"):
+        s = extract_2024_capacity(df)
+        _, year = capacity_row(df)
+    return pd.DataFrame({"source": s.index.astype(str), "capacity": s.to_numpy(dtype=float),
+                         "year": float("nan") if year is None else float(year)})
+
+
+def capacity_series(table: pd.DataFrame) -> pd.Series:
+    return pd.Series(table["capacity"].to_numpy(), index=table["source"].to_numpy())
+
+
+def plot_capacity_bars(series: pd.Series, output_path: str = OUTPUT_PATH,
+                       title: str = "China Installed Generation Capacity by Source (2024)",
+                       source_url: str = EIA_FIG7_URL) -> None:
+    with span("render.savefig", output=os.path.basename(output_path)):
+        render_bars(series.to_dict(), output_path, title, source_url)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Render the China 2024 installed-capacity chart from EIA figure7 data.")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome-trace JSON of stage timings (or set EIA_TRACE)")
+    args = parser.parse_args()
+    if args.trace:
+        enable(args.trace)
     ensure_dir(DATA_DIR)
     xlsx_path = os.path.join(DATA_DIR, "figure7_data.xlsx")
-    alt_xlsx_path = os.path.join(ALT_DATA_DIR, "figure7_data.xlsx")
     try:
-        download_excel(EIA_FIG7_URL, xlsx_path)
+        with span("download", url=EIA_FIG7_URL):
+            download_excel(EIA_FIG7_URL, xlsx_path)
     except Exception as e:
         print("Failed to download EIA Excel:", e)
         print("If network blocks the file, please manually download from:")
         print(EIA_FIG7_URL)
         print(f"and place it at: {xlsx_path}")
-    if not os.path.exists(xlsx_path) and os.path.exists(alt_xlsx_path):
-        xlsx_path = alt_xlsx_path
-        print("Using alternative data path:", xlsx_path)
+    archived = None if os.path.exists(xlsx_path) else latest_path(EIA_FIG7_URL)
+    if archived:
+        xlsx_path = archived
+        print("Using the latest archived release:", xlsx_path)
     print("Reading:", xlsx_path, "exists=", os.path.exists(xlsx_path))
-    df = load_figure7_dataframe(xlsx_path)
-    s = extract_2024_capacity(df)
-    plot_capacity_bars(s)
+    table = load_cached(xlsx_path, "figure7", load_capacity_table)
+    with span("render"):
+        plot_capacity_bars(capacity_series(table))
     print(f"Saved capacity chart to: {OUTPUT_PATH}")
 
 
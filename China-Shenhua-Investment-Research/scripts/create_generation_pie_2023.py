@@ -0,0 +1,112 @@
+import argparse
+import os
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from create_eia_generation_timeseries import DATA_DIR, EIA_FIG6_URL, load_generation_table
+from cjk_fonts import report_missing_glyphs, summarised_glyph_warnings, use_cjk_rcparams
+from eia_cache import load_cached
+from eia_fetch import download_excel
+
+IMAGES_DIR = os.path.join(os.path.dirname(__file__), "..", "01-industry", "images")
+YEAR = 2023
+
+# slice order follows the published chart: coal first, counter-clockwise from 12 o'clock
+ORDER = ["coal", "non_hydro_renewables", "hydro", "nuclear", "natural_gas"]
+COLORS = {
+    "coal": "#2C3E50",
+    "non_hydro_renewables": "#27AE60",
+    "hydro": "#3498DB",
+    "nuclear": "#F39C12",
+    "natural_gas": "#E74C3C",
+}
+LOCALES = {
+    "en": {
+        "labels": {
+            "coal": "Coal",
+            "non_hydro_renewables": "Other renewables",
+            "hydro": "Hydro",
+            "nuclear": "Nuclear",
+            "natural_gas": "Natural gas",
+        },
+        "title": "China Electricity Generation by Source ({year})\nBased on EIA Official Data",
+        "footer": "Source: U.S. Energy Information Administration (EIA), International Energy Statistics, {year}\n"
+                  "Total Generation: {total:,.1f} billion kWh",
+        "output": "china_electricity_generation_{year}.png",
+    },
+    "cn": {
+        "labels": {
+            "coal": "煤炭",
+            "non_hydro_renewables": "其他可再生能源",
+            "hydro": "水电",
+            "nuclear": "核电",
+            "natural_gas": "天然气",
+        },
+        "title": "中国电力生产结构 ({year}年)\n基于EIA官方数据",
+        "footer": "数据来源：美国能源信息署(EIA)，国际能源统计，{year}\n"
+                  "总发电量：{total:,.1f} 十亿千瓦时",
+        "output": "china_electricity_generation_{year}_cn.png",
+    },
+}
+
+
+def generation_shares(df: pd.DataFrame, year: int = YEAR) -> pd.Series:
+    # one year's generation (TWh) per source; the chart is titled with the year, so a missing year is an error
+    rows = df[df["year"] == year]
+    values = pd.Series({k: float(rows[k].iloc[-1]) for k in ORDER if k in rows.columns and not rows.empty
+                        and pd.notna(rows[k].iloc[-1])})
+    if values.empty:
+        years = df["year"].dropna().astype(int)
+        raise ValueError(f"no {year} generation in the table (years {years.min()}-{years.max()})" if len(years)
+                         else f"no {year} generation in the table")
+    return values
+
+
+def plot_generation_pie(values: pd.Series, locale: str, year: int = YEAR) -> str:
+    spec = LOCALES[locale]
+    missing = set()
+    if locale == "cn":
+        use_cjk_rcparams()
+        missing = report_missing_glyphs(list(spec["labels"].values()) + [spec["title"], spec["footer"]], locale)
+    keys = list(values.index)
+    fig, ax = plt.subplots(figsize=(8.6, 8.2))
+    wedges, texts, autotexts = ax.pie(values.to_numpy(),
+                                      labels=[spec["labels"][k] for k in keys],
+                                      colors=[COLORS[k] for k in keys],
+                                      explode=[0.1 if k == "coal" else 0 for k in keys],
+                                      autopct='%1.0f%%',
+                                      startangle=90,
+                                      pctdistance=0.8,
+                                      textprops={'fontsize': 12})
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_weight('bold')
+    ax.set_title(spec["title"].format(year=year), fontsize=16, fontweight='bold')
+    ax.axis('equal')
+    plt.figtext(0.5, 0.02, spec["footer"].format(year=year, total=values.sum()),
+                ha='center', fontsize=10, style='italic', color='gray')
+    output_path = os.path.join(IMAGES_DIR, spec["output"].format(year=year))
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with summarised_glyph_warnings(missing):
+        plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
+    plt.close(fig)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the China generation-mix pie from EIA figure6 data.")
+    parser.add_argument("--locale", choices=sorted(LOCALES) + ["all"], default="all")
+    parser.add_argument("--year", type=int, default=YEAR)
+    args = parser.parse_args()
+    xlsx_path = os.path.join(DATA_DIR, "figure6_data.xlsx")
+    try:
+        download_excel(EIA_FIG6_URL, xlsx_path)
+    except Exception as e:
+        print("Failed to download EIA Excel:", e)
+    values = generation_shares(load_cached(xlsx_path, "figure6", load_generation_table), args.year)
+    for locale in (sorted(LOCALES) if args.locale == "all" else [args.locale]):
+        print("Saved generation pie to:", plot_generation_pie(values, locale, args.year))
+
+
+if __name__ == "__main__":
+    main()
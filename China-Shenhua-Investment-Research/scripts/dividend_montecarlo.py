@@ -0,0 +1,157 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+# illustrative full-year assumptions for the thesis in 03-financials/key_drivers.md and
+# 04-valuation/dividend_logic.md; not company guidance. Units: RMB/t, Mt, RMB bn, RMB/share
+BASE_CASE = {
+    "coal_price": 560.0,        # average selling price
+    "volume": 450.0,            # commercial coal sales
+    "unit_cost": 380.0,         # all-in cash cost per tonne sold, incl. purchased coal and logistics
+    "capex": 35.0,
+    "other_ocf": 25.0,          # operating cash flow of the rail, port and power segments
+    "tax_rate": 0.25,
+    "shares": 19.87,            # bn shares outstanding
+    "dps": 2.26,                # declared dividend per share
+    "share_price": 40.0,
+    "payout_ratio": 0.75,       # share of free cash flow the implied yield assumes is paid out
+}
+# annual log-volatility of each driver and their correlations, in DRIVERS order;
+# costs and capex move with the coal price, which is where the downside protection comes from
+DRIVERS = ("coal_price", "volume", "unit_cost", "capex")
+VOLATILITY = (0.25, 0.05, 0.08, 0.15)
+CORRELATION = (
+    (1.0, 0.2, 0.4, 0.3),
+    (0.2, 1.0, 0.1, 0.1),
+    (0.4, 0.1, 1.0, 0.2),
+    (0.3, 0.1, 0.2, 1.0),
+)
+METRICS = ("ocf", "fcf", "coverage", "implied_yield")
+PERCENTILES = (5, 25, 50, 75, 95)
+HIST_BINS = 1 << 14  # per metric; percentiles are read to within 1/HIST_BINS of the sampled range
+
+
+def draw_drivers(rng: np.random.Generator, n: int, params: dict,
+                 volatility=VOLATILITY, correlation=CORRELATION) -> np.ndarray:
+    # (n, 4) joint lognormal draws centred on the base case (median = base value)
+    chol = np.linalg.cholesky(np.asarray(correlation, dtype=float))
+    shocks = rng.standard_normal((n, len(DRIVERS))) @ chol.T
+    shocks *= np.asarray(volatility)
+    np.exp(shocks, out=shocks)
+    shocks *= np.array([params[k] for k in DRIVERS])
+    return shocks
+
+
+def cash_flows(drivers: np.ndarray, params: dict) -> dict:
+    # every output is one array over all paths; no per-path Python
+    price, volume, unit_cost, capex = drivers.T
+    ocf = (price - unit_cost) * volume / 1000.0 * (1.0 - params["tax_rate"]) + params["other_ocf"]
+    fcf = ocf - capex
+    dividend = params["dps"] * params["shares"]
+    return {
+        "ocf": ocf,
+        "fcf": fcf,
+        "coverage": fcf / dividend,
+        "implied_yield": params["payout_ratio"] * np.maximum(fcf, 0.0) / params["shares"] / params["share_price"],
+    }
+
+
+def _bin_range(x: np.ndarray) -> tuple:
+    # histogram range fixed from the first chunk, widened so later chunks rarely land in the edge bins
+    lo, hi = float(x.min()), float(x.max())
+    pad = (hi - lo) * 0.5 or max(abs(lo), 1.0)
+    return lo - pad, hi + pad
+
+
+def _hist_percentiles(counts: np.ndarray, lo: float, hi: float, percentiles) -> np.ndarray:
+    # percentiles of binned data, interpolated linearly within the bin that holds each one
+    cum = np.cumsum(counts)
+    targets = np.asarray(percentiles, dtype=float) / 100.0 * cum[-1]
+    i = np.minimum(np.searchsorted(cum, targets), len(counts) - 1)
+    frac = (targets - (cum[i] - counts[i])) / np.maximum(counts[i], 1)
+    return lo + (i + frac) * (hi - lo) / len(counts)
+
+
+def simulate(paths: int, params: dict = None, chunk_size: int = 1_000_000, seed: int = 0,
+             volatility=VOLATILITY, correlation=CORRELATION) -> dict:
+    # draws are made chunk by chunk and nothing is kept per path: each chunk is folded into running
+    # moments (mean and M2, combined as in Chan et al.) and a fixed-bin histogram per metric, so memory
+    # is ~chunk_size x 4 drivers plus 4 x HIST_BINS counts however many paths are drawn
+    params = {**BASE_CASE, **(params or {})}
+    rng = np.random.default_rng(seed)
+    means = dict.fromkeys(METRICS, 0.0)
+    m2 = dict.fromkeys(METRICS, 0.0)
+    hists, ranges, extremes = {}, {}, {}
+    fcf_negative = coverage_short = 0
+    for start in range(0, paths, chunk_size):
+        n = min(chunk_size, paths - start)
+        out = cash_flows(draw_drivers(rng, n, params, volatility, correlation), params)
+        for m in METRICS:
+            x = out[m]
+            mean = float(x.mean())
+            delta = mean - means[m]
+            m2[m] += float(np.dot(x - mean, x - mean)) + delta * delta * start * n / (start + n)
+            means[m] += delta * n / (start + n)
+            if m not in ranges:
+                ranges[m] = _bin_range(x)
+                hists[m] = np.zeros(HIST_BINS, dtype=np.int64)
+                extremes[m] = (np.inf, -np.inf)
+            extremes[m] = (min(extremes[m][0], float(x.min())), max(extremes[m][1], float(x.max())))
+            lo, hi = ranges[m]
+            bins = np.clip((x - lo) * (HIST_BINS / (hi - lo)), 0, HIST_BINS - 1).astype(np.intp)
+            hists[m] += np.bincount(bins, minlength=HIST_BINS)
+        fcf_negative += int(np.count_nonzero(out["fcf"] < 0))
+        coverage_short += int(np.count_nonzero(out["coverage"] < 1))
+    summary = {}
+    for m in METRICS:
+        # clamped to the observed extremes, which also makes point masses (a yield floored at 0) exact
+        pct = np.clip(_hist_percentiles(hists[m], *ranges[m], PERCENTILES), *extremes[m])
+        summary[m] = {
+            "mean": means[m],
+            "std": (m2[m] / paths) ** 0.5,
+            **{f"p{p}": float(v) for p, v in zip(PERCENTILES, pct)},
+        }
+    summary["prob_fcf_negative"] = fcf_negative / paths
+    summary["prob_dividend_uncovered"] = coverage_short / paths
+    summary["paths"] = paths
+    summary["params"] = params
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    labels = {"ocf": "OCF (RMB bn)", "fcf": "FCF (RMB bn)", "coverage": "FCF / dividend", "implied_yield": "Implied yield"}
+    print(f"{'':16s}" + "".join(f"{h:>10s}" for h in ["mean", "std"] + [f"p{p}" for p in PERCENTILES]))
+    for m in METRICS:
+        s = summary[m]
+        fmt = "{:>10.2%}" if m == "implied_yield" else "{:>10.2f}"
+        print(f"{labels[m]:16s}" + "".join(fmt.format(s[k]) for k in ["mean", "std"] + [f"p{p}" for p in PERCENTILES]))
+    print(f"P(FCF < 0) = {summary['prob_fcf_negative']:.2%}   "
+          f"P(dividend not covered by FCF) = {summary['prob_dividend_uncovered']:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo test of China Shenhua's dividend sustainability.")
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=1_000_000, help="paths drawn per batch (bounds working memory)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--params", help="JSON file overriding BASE_CASE entries")
+    parser.add_argument("--output", help="write the summary as JSON")
+    args = parser.parse_args()
+    params = {}
+    if args.params:
+        with open(args.params, "r", encoding="utf-8") as f:
+            params = json.load(f)
+    start = time.perf_counter()
+    summary = simulate(args.paths, params, args.chunk, args.seed)
+    print(f"{args.paths:,} paths in {time.perf_counter() - start:.2f}s")
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print("Summary saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()
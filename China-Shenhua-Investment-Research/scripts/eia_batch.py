@@ -0,0 +1,121 @@
+import argparse
+import os
+import re
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+# workers render headless; must be set before pyplot is imported anywhere
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from eia_fetch import DATA_DIR, build_manifest, fetch_manifest, figure_path, figure_url, parse_figures
+
+BATCH_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "01-industry", "images", "countries")
+
+
+def country_slug(country: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", country.lower()).strip("_")
+
+
+def output_path(country: str, figure: int, output_dir: str = BATCH_OUTPUT_DIR) -> str:
+    names = {
+        6: "electricity_generation_timeseries",
+        7: "installed_generation_capacity_2024",
+    }
+    return os.path.join(output_dir, f"{country_slug(country)}_{names.get(figure, f'figure{figure}')}.png")
+
+
+def render_figure6(country: str, xlsx_path: str, out_path: str) -> None:
+    from create_eia_generation_timeseries import load_generation_table, plot_timeseries
+    from eia_cache import load_cached
+
+    df = load_cached(xlsx_path, "figure6", load_generation_table)
+    years = df["year"].dropna()
+    span = f" ({int(years.min())}–{int(years.max())})" if len(years) else ""
+    plot_timeseries(df, {k: k for k in df.columns}, output_path=out_path,
+                    title=f"{country} Electricity Generation by Source{span}",
+                    source_url=figure_url(country, 6))
+
+
+def render_figure7(country: str, xlsx_path: str, out_path: str) -> None:
+    from create_eia_capacity_2024 import capacity_series, load_capacity_table, plot_capacity_bars
+    from eia_cache import load_cached
+
+    series = capacity_series(load_cached(xlsx_path, "figure7", load_capacity_table))
+    if series.empty:
+        raise ValueError("No capacity series found in EIA figure7 Excel.")
+    plot_capacity_bars(series, output_path=out_path,
+                       title=f"{country} Installed Generation Capacity by Source (2024)",
+                       source_url=figure_url(country, 7))
+
+
+RENDERERS = {
+    6: render_figure6,
+    7: render_figure7,
+}
+
+
+def run_task(task: tuple) -> dict:
+    # one (country, figure) combination; failures are reported, never raised, so the batch carries on
+    country, figure, xlsx_path, out_path = task
+    result = {"country": country, "figure": figure, "input": xlsx_path, "output": out_path}
+    try:
+        renderer = RENDERERS.get(figure)
+        if renderer is None:
+            raise ValueError(f"No chart defined for EIA figure{figure}")
+        if not os.path.exists(xlsx_path):
+            raise FileNotFoundError(f"Workbook not found: {xlsx_path}")
+        renderer(country, xlsx_path, out_path)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    return result
+
+
+def run_batch(countries: list, figures: list, workers: int = None, fetch: bool = True,
+              data_dir: str = DATA_DIR, output_dir: str = BATCH_OUTPUT_DIR) -> list:
+    # task order (and therefore result order) depends only on the arguments, not on scheduling
+    countries = sorted(set(countries))
+    figures = sorted(set(figures))
+    if fetch:
+        for r in fetch_manifest(build_manifest(countries, figures, data_dir=data_dir)):
+            if r["status"] == "error":
+                print("Fetch failed:", r["url"], r["error"])
+    tasks = [(c, f, figure_path(c, f, data_dir), output_path(c, f, output_dir))
+             for c in countries for f in figures]
+    if workers == 1 or len(tasks) <= 1:
+        return [run_task(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_task, tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch, parse and chart EIA countries_long figures for many countries.")
+    parser.add_argument("--countries", default="China", help="comma-separated EIA country names")
+    parser.add_argument("--figures", default="6,7", help="figure numbers, e.g. 6,7")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: CPU count)")
+    parser.add_argument("--no-fetch", action="store_true", help="use workbooks already under data/eia")
+    parser.add_argument("--store", action="store_true", help="append parsed observations to the data/store series store")
+    args = parser.parse_args()
+    results = run_batch(args.countries.split(","), parse_figures(args.figures),
+                        workers=args.workers, fetch=not args.no_fetch)
+    if args.store:
+        # single writer, after the pool: workers' parse-cache entries make this a re-read, not a re-parse
+        from eia_store import ingest
+
+        for r in results:
+            if r["status"] == "ok":
+                print(f"Stored {ingest(r['country'], r['figure'], r['input'])} new observations "
+                      f"for {r['country']} figure{r['figure']}")
+    failed = [r for r in results if r["status"] != "ok"]
+    for r in results:
+        line = f"{r['status']:>5}  {r['country']} figure{r['figure']}"
+        print(line + (f"  -> {r['output']}" if r["status"] == "ok" else f"  ({r['error']})"))
+    print(f"{len(results) - len(failed)}/{len(results)} charts rendered")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
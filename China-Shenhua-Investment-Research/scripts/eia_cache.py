@@ -0,0 +1,122 @@
+import argparse
+import glob
+import hashlib
+import os
+import tempfile
+from typing import Callable, Optional
+
+import pandas as pd
+
+from instrument import count, span
+
+# bump whenever a loader change alters its tidy output; older entries then stop matching
+PARSER_VERSION = "3"
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "parsed")
+MAX_CACHE_BYTES = int(os.environ.get("EIA_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_path(digest: str, kind: str) -> str:
+    return os.path.join(CACHE_DIR, f"{kind}-{digest}-v{PARSER_VERSION}.feather")
+
+
+def load_cached(xlsx_path: str, kind: str, build: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+    # tidy output of build(xlsx_path), reused for as long as the workbook bytes and parser version match
+    if os.environ.get("EIA_CACHE_DISABLE"):
+        return build(xlsx_path)
+    path = cache_path(file_sha256(xlsx_path), kind)
+    try:
+        with span("cache.read", kind=kind):
+            df = pd.read_feather(path)
+        os.utime(path)  # recency for eviction
+        count("cache.hits")
+        return df
+    except (FileNotFoundError, ImportError):
+        pass
+    except Exception as e:
+        print("Discarding unreadable cache entry:", path, e)
+        _remove(path)
+    count("cache.misses")
+    with span("parse." + kind, path=xlsx_path):
+        df = build(xlsx_path)
+    store(df, path)
+    return df
+
+
+def store(df: pd.DataFrame, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        df.reset_index(drop=True).to_feather(tmp)
+        os.replace(tmp, path)
+    except Exception as e:
+        # frames Arrow cannot represent (mixed object columns, non-string labels) are simply not cached
+        print("Skipping parse cache for", os.path.basename(path), "-", e)
+        _remove(tmp)
+        return
+    evict()
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES) -> int:
+    # drop least recently used entries until the cache fits in max_bytes
+    entries = []
+    for p in glob.glob(os.path.join(CACHE_DIR, "*.feather")):
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, p in entries:
+        if total <= max_bytes:
+            break
+        _remove(p)
+        total -= size
+        removed += 1
+    return removed
+
+
+def invalidate(xlsx_path: Optional[str] = None, kind: Optional[str] = None) -> int:
+    # remove entries for one workbook and/or one kind; no arguments clears the whole cache
+    digest = file_sha256(xlsx_path) if xlsx_path else "*"
+    pattern = os.path.join(CACHE_DIR, f"{kind or '*'}-{digest}-v*.feather")
+    paths = glob.glob(pattern)
+    for p in paths:
+        _remove(p)
+    return len(paths)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the parsed EIA workbook cache.")
+    parser.add_argument("--invalidate", metavar="XLSX", help="drop cached tables for this workbook")
+    parser.add_argument("--kind", help="restrict --invalidate/--clear to one table kind (e.g. figure6)")
+    parser.add_argument("--clear", action="store_true", help="drop every cached table")
+    parser.add_argument("--max-bytes", type=int, help="evict least recently used entries down to this size")
+    args = parser.parse_args()
+    if args.invalidate or args.clear:
+        n = invalidate(args.invalidate, args.kind)
+        print(f"Removed {n} cache entries")
+    if args.max_bytes is not None:
+        n = evict(args.max_bytes)
+        print(f"Evicted {n} cache entries")
+
+
+if __name__ == "__main__":
+    main()
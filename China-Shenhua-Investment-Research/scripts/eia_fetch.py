@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+EIA_BASE_URL = os.environ.get("EIA_BASE_URL", "https://www.eia.gov")
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "eia")
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def figure_url(country: str, figure: int, base_url: str = None) -> str:
+    base = (base_url or EIA_BASE_URL).rstrip("/")
+    return (f"{base}/international/content/analysis/countries_long/{country}"
+            f"/content/analysis/countries_long/{country}/excel/figure{figure}_data.xlsx")
+
+
+def figure_path(country: str, figure: int, data_dir: str = DATA_DIR) -> str:
+    # China keeps the historical flat layout the chart scripts read from
+    if country == "China":
+        return os.path.join(data_dir, f"figure{figure}_data.xlsx")
+    return os.path.join(data_dir, country, f"figure{figure}_data.xlsx")
+
+
+def build_manifest(countries: list, figures: list, base_url: str = None, data_dir: str = DATA_DIR) -> list:
+    return [(figure_url(c, f, base_url), figure_path(c, f, data_dir)) for c in countries for f in figures]
+
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (GitHub Copilot)",
+        "Accept": f"{XLSX_CONTENT_TYPE},application/octet-stream,*/*",
+    })
+    return session
+
+
+def _meta_path(dest_path: str) -> str:
+    return dest_path + ".meta.json"
+
+
+def _read_meta(dest_path: str) -> dict:
+    try:
+        with open(_meta_path(dest_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _is_workbook(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(2) == b"PK"
+    except OSError:
+        return False
+
+
+def fetch_one(session: requests.Session, url: str, dest_path: str,
+              retries: int = 3, backoff: float = 0.5, timeout: float = 30, vault_dir: str = None) -> dict:
+    # conditional GET: a cached workbook is only replaced when the server reports a change
+    headers = {"Referer": url.rsplit("/content/analysis/countries_long/", 1)[0] + "/"}
+    meta = _read_meta(dest_path) if _is_workbook(dest_path) else {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    for attempt in range(retries + 1):
+        try:
+            resp = session.get(url, headers=headers, timeout=timeout)
+            if resp.status_code in RETRY_STATUSES and attempt < retries:
+                time.sleep(backoff * 2 ** attempt)
+                continue
+            if resp.status_code == 304:
+                # remembered so freshness checks can tell "verified unchanged" from "old download"
+                meta["checked_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                _atomic_write(_meta_path(dest_path), json.dumps(meta, indent=2).encode("utf-8"))
+                return {"url": url, "path": dest_path, "status": "not_modified"}
+            resp.raise_for_status()
+            content_type = resp.headers.get("content-type", "")
+            content = resp.content
+            # basic validation for xlsx (zip-based): should start with PK
+            if XLSX_CONTENT_TYPE not in content_type and not content.startswith(b"PK"):
+                raise ValueError(f"Unexpected content type when downloading Excel: {content_type} status={resp.status_code}")
+            _atomic_write(dest_path, content)
+            new_meta = {
+                "url": url,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            new_meta["checked_at"] = new_meta["fetched_at"]
+            try:
+                # every distinct release is also archived, so overwriting dest_path loses no history;
+                # eia_vault is stdlib-only at import, so this keeps the fetch path free of pandas
+                import eia_vault
+
+                new_meta["sha256"] = eia_vault.put(content, url, new_meta["etag"], new_meta["last_modified"],
+                                                   new_meta["fetched_at"],
+                                                   vault_dir or eia_vault.VAULT_DIR)["sha256"]
+            except OSError as e:
+                print("Could not archive", url, "in the vault:", e)
+            _atomic_write(_meta_path(dest_path), json.dumps(new_meta, indent=2).encode("utf-8"))
+            return {"url": url, "path": dest_path, "status": "downloaded", "bytes": len(content)}
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt < retries:
+                time.sleep(backoff * 2 ** attempt)
+                continue
+            return {"url": url, "path": dest_path, "status": "error", "error": str(e)}
+        except Exception as e:
+            return {"url": url, "path": dest_path, "status": "error", "error": str(e)}
+    return {"url": url, "path": dest_path, "status": "error", "error": "retries exhausted"}
+
+
+def fetch_manifest(manifest: list, max_workers: int = 8, session: requests.Session = None, **kwargs) -> list:
+    # manifest: [(url, dest_path), ...]; results come back in manifest order
+    if not manifest:
+        return []
+    session = session or make_session(max_workers)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(manifest))) as pool:
+        futures = [pool.submit(fetch_one, session, url, dest, **kwargs) for url, dest in manifest]
+        return [f.result() for f in futures]
+
+
+def download_excel(url: str, dest_path: str) -> None:
+    # single-file entry point used by the chart scripts
+    if os.environ.get("EIA_SKIP_FETCH") and _is_workbook(dest_path):
+        return
+    result = fetch_one(make_session(1), url, dest_path)
+    if result["status"] == "error":
+        if _is_workbook(dest_path):
+            # offline or upstream trouble: the previously fetched copy is still usable
+            print("Could not refresh", os.path.basename(dest_path), "- using cached copy:", result["error"])
+            return
+        raise RuntimeError(result["error"])
+
+
+def parse_figures(spec: str) -> list:
+    figures = []
+    for part in spec.split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            figures.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            figures.append(int(part))
+    return figures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh EIA countries_long figure workbooks.")
+    parser.add_argument("--countries", default="China", help="comma-separated EIA country names")
+    parser.add_argument("--figures", default="6,7", help="figure numbers, e.g. 1-12 or 6,7")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--base-url", default=None, help="override the EIA host (e.g. a local mirror)")
+    args = parser.parse_args()
+    manifest = build_manifest(args.countries.split(","), parse_figures(args.figures), args.base_url)
+    results = fetch_manifest(manifest, max_workers=args.workers)
+    for r in results:
+        print(f"{r['status']:>12}  {r['path']}" + (f"  ({r['error']})" if r["status"] == "error" else ""))
+    if any(r["status"] == "error" for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "layouts.json")
+PROBE_ROWS = 16  # covers every header row the loaders scan (0-15)
+
+
+def _label(cell):
+    # text cells are structure (titles, headers, series labels); numbers are data and only their
+    # position counts, so revised values and extra year rows leave the fingerprint unchanged
+    if cell is None:
+        return None
+    return cell.strip() if isinstance(cell, str) else "#"
+
+
+def workbook_fingerprint(xlsx_path: str, probe_rows: int = PROBE_ROWS) -> str:
+    # structural identity of a workbook: sheet titles, column count and the label cells of the rows
+    # where the header is searched for; row count and data values are left out, so a new release with
+    # the same layout maps to the same entry. read-only mode streams just those rows.
+    from openpyxl import load_workbook
+
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        shape = []
+        for ws in wb.worksheets:
+            # rows without any text (data rows, blanks) are skipped, but labelled rows keep their index
+            head = [[i, [_label(c) for c in row]]
+                    for i, row in enumerate(ws.iter_rows(max_row=probe_rows, values_only=True))
+                    if any(isinstance(c, str) and c.strip() for c in row)]
+            shape.append([ws.title, ws.max_column, head])
+    finally:
+        wb.close()
+    blob = json.dumps(shape, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _read_registry() -> dict:
+    try:
+        with open(REGISTRY_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+@contextmanager
+def _registry_lock():
+    # exclusive lock on a sidecar file: eia_batch workers remember layouts concurrently, and an
+    # unlocked read-modify-write would drop whichever entries lost the race
+    os.makedirs(os.path.dirname(REGISTRY_PATH), exist_ok=True)
+    with open(REGISTRY_PATH + ".lock", "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def lookup(kind: str, fingerprint: str) -> Optional[dict]:
+    return _read_registry().get(kind, {}).get(fingerprint)
+
+
+def remember(kind: str, fingerprint: str, layout: dict) -> None:
+    if lookup(kind, fingerprint) == layout:
+        return
+    with _registry_lock():
+        # re-read under the lock so entries written by other processes since are kept
+        registry = _read_registry()
+        if registry.get(kind, {}).get(fingerprint) == layout:
+            return
+        registry.setdefault(kind, {})[fingerprint] = layout
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(REGISTRY_PATH), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(registry, f, indent=2, sort_keys=True)
+            os.replace(tmp, REGISTRY_PATH)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
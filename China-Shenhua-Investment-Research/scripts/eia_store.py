@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "store")
+INDEX_NAME = "index.json"
+SCHEMA = pa.schema([
+    ("year", pa.int16()),
+    ("value", pa.float64()),
+])
+# observation columns accepted by append(); the key columns live in the index, not the batches
+KEY_COLUMNS = ["country", "figure", "series"]
+
+
+# Layout: every append writes one immutable Arrow IPC file (uncompressed, so it can be
+# memory-mapped) holding one record batch per (country, figure, series). index.json maps
+# each key to its (segment, batch) locations, so reading a series maps only those batches.
+# Later segments override earlier ones year by year; compact() folds them back into one file.
+
+
+def _key(country: str, figure: int, series: str) -> str:
+    return f"{country}|{int(figure)}|{series}"
+
+
+def _split_key(key: str) -> tuple:
+    country, figure, series = key.split("|", 2)
+    return country, int(figure), series
+
+
+def read_index(store_dir: str = STORE_DIR) -> dict:
+    try:
+        with open(os.path.join(store_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"segments": [], "keys": {}, "next_segment": 1}
+
+
+def _write_index(index: dict, store_dir: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp, os.path.join(store_dir, INDEX_NAME))
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _write_segment(groups: dict, path: str) -> dict:
+    # one batch per key, in sorted key order; returns key -> batch number
+    batches = {}
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+            for i, key in enumerate(sorted(groups)):
+                years, values = groups[key]
+                writer.write_batch(pa.record_batch([pa.array(years, pa.int16()), pa.array(values, pa.float64())],
+                                                   schema=SCHEMA))
+                batches[key] = i
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return batches
+
+
+@lru_cache(maxsize=32)
+def _reader(path: str, mtime_ns: int) -> pa.ipc.RecordBatchFileReader:
+    # segments are immutable, so one mapping (and one footer read) per file is enough
+    return pa.ipc.open_file(pa.memory_map(path, "r"))
+
+
+def _batch(store_dir: str, segment: str, batch: int) -> pa.RecordBatch:
+    # zero-copy view into the memory-mapped segment; only this batch's pages are touched
+    path = os.path.join(store_dir, segment)
+    return _reader(os.path.realpath(path), os.stat(path).st_mtime_ns).get_batch(batch)
+
+
+def _series_arrays(store_dir: str, index: dict, key: str) -> tuple:
+    locations = index["keys"].get(key, [])
+    if len(locations) == 1:
+        batch = _batch(store_dir, *locations[0])
+        return batch.column(0).to_numpy(), batch.column(1).to_numpy()
+    years, values = [], []
+    for segment, batch_no in locations:
+        batch = _batch(store_dir, segment, batch_no)
+        years.append(batch.column(0).to_numpy())
+        values.append(batch.column(1).to_numpy())
+    if not years:
+        return np.empty(0, dtype=np.int16), np.empty(0, dtype=np.float64)
+    years = np.concatenate(years)
+    values = np.concatenate(values)
+    # last write wins: keep the final occurrence of each year, then sort by year
+    _, last = np.unique(years[::-1], return_index=True)
+    keep = len(years) - 1 - last
+    return years[keep], values[keep]
+
+
+def read_series(country: str, figure: int, series: str, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    years, values = _series_arrays(store_dir, read_index(store_dir), _key(country, figure, series))
+    return pd.DataFrame({"year": years, "value": values})
+
+
+def keys(store_dir: str = STORE_DIR, country: Optional[str] = None, figure: Optional[int] = None) -> list:
+    out = [_split_key(k) for k in sorted(read_index(store_dir)["keys"])]
+    return [k for k in out if (country is None or k[0] == country) and (figure is None or k[1] == int(figure))]
+
+
+def read(country: Optional[str] = None, figure: Optional[int] = None, series: Optional[str] = None,
+         store_dir: str = STORE_DIR) -> pd.DataFrame:
+    # long (country, figure, series, year, value) frame for every key matching the filters
+    index = read_index(store_dir)
+    frames = []
+    for c, f, s in keys(store_dir, country, figure):
+        if series is not None and s != series:
+            continue
+        years, values = _series_arrays(store_dir, index, _key(c, f, s))
+        frames.append(pd.DataFrame({"country": c, "figure": f, "series": s, "year": years, "value": values}))
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLUMNS + ["year", "value"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _next_segment(index: dict) -> str:
+    # file names are never reused, so a reader holding an old index never sees different bytes
+    n = index.get("next_segment", len(index["segments"]) + 1)
+    index["next_segment"] = n + 1
+    return f"segment-{n:06d}.arrow"
+
+
+def append(observations: pd.DataFrame, release: Optional[str] = None, store_dir: str = STORE_DIR) -> int:
+    # add (country, figure, series, year, value) rows as a new segment; only observations that are
+    # new or differ from what the store already returns are written. Returns the rows written.
+    os.makedirs(store_dir, exist_ok=True)
+    index = read_index(store_dir)
+    obs = observations.dropna(subset=["year"])
+    groups = {}
+    for (country, figure, series), g in obs.groupby(KEY_COLUMNS, sort=False):
+        key = _key(country, figure, series)
+        years = g["year"].to_numpy(dtype=np.int16)
+        values = g["value"].to_numpy(dtype=np.float64)
+        # batches are stored sorted by year, one row per year (the last given wins)
+        _, last = np.unique(years[::-1], return_index=True)
+        keep = len(years) - 1 - last
+        years, values = years[keep], values[keep]
+        old_years, old_values = _series_arrays(store_dir, index, key)
+        if old_years.size:
+            pos = np.searchsorted(old_years, years).clip(max=old_years.size - 1)
+            seen = old_years[pos] == years
+            same = seen & ((old_values[pos] == values) | (np.isnan(old_values[pos]) & np.isnan(values)))
+            years, values = years[~same], values[~same]
+        if years.size:
+            groups[key] = (years, values)
+    if not groups:
+        return 0
+    segment = _next_segment(index)
+    batches = _write_segment(groups, os.path.join(store_dir, segment))
+    index["segments"].append({"file": segment, "release": release,
+                              "written": datetime.now(timezone.utc).isoformat(timespec="seconds")})
+    for key, batch_no in batches.items():
+        index["keys"].setdefault(key, []).append([segment, batch_no])
+    _write_index(index, store_dir)
+    return sum(len(y) for y, _ in groups.values())
+
+
+def compact(store_dir: str = STORE_DIR) -> int:
+    # rewrite every key's resolved series into a single segment and drop the old files
+    index = read_index(store_dir)
+    if len(index["segments"]) <= 1:
+        return 0
+    groups = {key: _series_arrays(store_dir, index, key) for key in index["keys"]}
+    old = [s["file"] for s in index["segments"]]
+    segment = _next_segment(index)
+    batches = _write_segment(groups, os.path.join(store_dir, segment))
+    releases = [s["release"] for s in index["segments"] if s.get("release")]
+    new_index = {
+        "segments": [{"file": segment, "release": releases[-1] if releases else None,
+                      "written": datetime.now(timezone.utc).isoformat(timespec="seconds"), "compacted": len(old)}],
+        "keys": {key: [[segment, batch_no]] for key, batch_no in batches.items()},
+        "next_segment": index["next_segment"],
+    }
+    _write_index(new_index, store_dir)
+    for name in old:
+        try:
+            os.remove(os.path.join(store_dir, name))
+        except OSError:
+            pass  # an open memory map on Windows; the file is no longer referenced
+    return len(old)
+
+
+def generation_observations(table: pd.DataFrame, country: str) -> pd.DataFrame:
+    # figure6 tidy table ('year' + one column per series) -> long observations
+    years = pd.to_numeric(table["year"], errors="coerce")
+    long = table.drop(columns=["year"]).apply(pd.to_numeric, errors="coerce")
+    long.insert(0, "year", years)
+    long = long.melt(id_vars="year", var_name="series", value_name="value")
+    long.insert(0, "figure", 6)
+    long.insert(0, "country", country)
+    return long.dropna(subset=["year"])
+
+
+def capacity_observations(table: pd.DataFrame, country: str, year: int = 2024) -> pd.DataFrame:
+    # figure7 tidy table (source, capacity, year) -> long observations, labelled with the year the
+    # loader actually selected; year is only the fallback for tables that carry none
+    selected = pd.to_numeric(table["year"], errors="coerce").dropna() if "year" in table else pd.Series(dtype=float)
+    return pd.DataFrame({"country": country, "figure": 7, "series": table["source"].astype(str),
+                         "year": int(selected.iloc[0]) if len(selected) else year,
+                         "value": table["capacity"].astype(float)})
+
+
+def observations(country: str, figure: int, xlsx_path: str) -> pd.DataFrame:
+    # parse through the same cached loaders the charts use
+    from eia_cache import load_cached
+
+    if figure == 6:
+        from create_eia_generation_timeseries import load_generation_table
+
+        return generation_observations(load_cached(xlsx_path, "figure6", load_generation_table), country)
+    if figure == 7:
+        from create_eia_capacity_2024 import load_capacity_table
+
+        return capacity_observations(load_cached(xlsx_path, "figure7", load_capacity_table), country)
+    raise ValueError(f"No parser for EIA figure{figure}")
+
+
+def ingest(country: str, figure: int, xlsx_path: str, release: Optional[str] = None,
+           store_dir: str = STORE_DIR) -> int:
+    obs = observations(country, figure, xlsx_path)
+    return append(obs, release=release or os.path.basename(xlsx_path), store_dir=store_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar store of parsed EIA observations.")
+    parser.add_argument("--store", default=STORE_DIR, help="store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="parse a workbook and append its observations")
+    p.add_argument("xlsx")
+    p.add_argument("--country", default="China")
+    p.add_argument("--figure", type=int, required=True)
+    p.add_argument("--release", help="label for this release (default: workbook file name)")
+    p = sub.add_parser("list", help="list stored (country, figure, series) keys")
+    p.add_argument("--country")
+    p.add_argument("--figure", type=int)
+    p = sub.add_parser("show", help="print one series")
+    p.add_argument("country")
+    p.add_argument("figure", type=int)
+    p.add_argument("series")
+    sub.add_parser("compact", help="fold all segments into one")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        n = ingest(args.country, args.figure, args.xlsx, args.release, args.store)
+        print(f"Appended {n} observations")
+    elif args.command == "list":
+        for c, f, s in keys(args.store, args.country, args.figure):
+            print(f"{c}\tfigure{f}\t{s}")
+    elif args.command == "show":
+        print(read_series(args.country, args.figure, args.series, args.store).to_string(index=False))
+    elif args.command == "compact":
+        print(f"Compacted {compact(args.store)} segments")
+
+
+if __name__ == "__main__":
+    main()
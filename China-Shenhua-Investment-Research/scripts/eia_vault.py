@@ -0,0 +1,190 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+VAULT_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "vault")
+MANIFEST_NAME = "manifest.json"
+REVISION_TOLERANCE = 1e-9
+
+# Every raw file ever fetched is kept as objects/<2 hex>/<sha256><ext>, written once and never
+# modified. manifest.json lists, per source URL, each distinct release in fetch order with its
+# ETag / Last-Modified. Re-fetching an unchanged file adds nothing, so a history of releases
+# costs one object per actual revision. Archiving needs only the standard library, so eia_fetch can
+# import this module without pulling in pandas; the vintage readers import it when called.
+
+_manifest_lock = threading.Lock()
+
+
+def object_path(digest: str, ext: str = ".xlsx", vault_dir: str = VAULT_DIR) -> str:
+    return os.path.join(vault_dir, "objects", digest[:2], digest + ext)
+
+
+def read_manifest(vault_dir: str = VAULT_DIR) -> dict:
+    try:
+        with open(os.path.join(vault_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"sources": {}}
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def put(content, url: str, etag: str = None, last_modified: str = None, fetched_at: str = None,
+        vault_dir: str = VAULT_DIR) -> dict:
+    # store one fetched file (bytes or any buffer, e.g. a memoryview of a mapped file);
+    # returns its release record (new=False when it matches the latest release)
+    digest = hashlib.sha256(content).hexdigest()
+    ext = os.path.splitext(url.split("?", 1)[0])[1] or ".bin"
+    path = object_path(digest, ext, vault_dir)
+    if not os.path.exists(path):
+        _atomic_write(path, content)
+    release = {
+        "sha256": digest,
+        "bytes": len(content),
+        "object": os.path.relpath(path, vault_dir),
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": fetched_at or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with _manifest_lock:
+        manifest = read_manifest(vault_dir)
+        history = manifest["sources"].setdefault(url, [])
+        if history and history[-1]["sha256"] == digest:
+            return dict(history[-1], new=False)
+        history.append(release)
+        _atomic_write(os.path.join(vault_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode("utf-8"))
+    return dict(release, new=True)
+
+
+def add_file(path: str, url: str, vault_dir: str = VAULT_DIR) -> dict:
+    # archive a workbook fetched before the vault existed, using its .meta.json sidecar when present
+    try:
+        with open(path + ".meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        meta = {}
+    from eia_workbook import mapped
+
+    fetched_at = meta.get("fetched_at") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(os.path.getmtime(path)))
+    # hashed and written straight from the mapping; the workbook is never copied into memory
+    with mapped(path) as f:
+        content = f.view()
+        try:
+            return put(content, url, meta.get("etag"), meta.get("last_modified"), fetched_at, vault_dir)
+        finally:
+            content.release()
+
+
+def releases(url: str, vault_dir: str = VAULT_DIR) -> list:
+    # release records for one source, oldest first, each with the absolute object path
+    history = read_manifest(vault_dir)["sources"].get(url, [])
+    return [dict(r, path=os.path.join(vault_dir, r["object"])) for r in history]
+
+
+def latest_path(url: str, vault_dir: str = VAULT_DIR):
+    # most recent archived copy of a source, or None
+    history = releases(url, vault_dir)
+    return history[-1]["path"] if history and os.path.exists(history[-1]["path"]) else None
+
+
+def vintages(url: str, country: str, figure: int, vault_dir: str = VAULT_DIR) -> "pd.DataFrame":
+    # long observations of every archived release, tagged with a release number and label
+    import pandas as pd
+
+    from eia_store import observations
+
+    frames = []
+    for i, r in enumerate(releases(url, vault_dir)):
+        obs = observations(country, figure, r["path"])
+        frames.append(obs.assign(release=i, label=f"{r['fetched_at']} {r['sha256'][:12]}"))
+    if not frames:
+        return pd.DataFrame(columns=["country", "figure", "series", "year", "value", "release", "label"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def vintage_diff(obs: "pd.DataFrame", tolerance: float = REVISION_TOLERANCE) -> "pd.DataFrame":
+    # (series, year) values that changed between consecutive releases: revised, added or dropped.
+    # All releases are laid out as one (series, year) x release matrix and compared column to column.
+    import numpy as np
+    import pandas as pd
+    columns = ["series", "year", "kind", "old", "new", "from_release", "to_release"]
+    if obs.empty:
+        return pd.DataFrame(columns=columns)
+    key_codes, keys = pd.factorize(pd.MultiIndex.from_arrays([obs["series"].astype(str), obs["year"].astype(int)]))
+    rel_codes, rels = pd.factorize(obs["release"], sort=True)
+    labels = obs.drop_duplicates("release").set_index("release")["label"].reindex(rels).to_numpy()
+    matrix = np.full((len(keys), len(rels)), np.nan)
+    matrix[key_codes, rel_codes] = obs["value"].to_numpy(dtype=float)
+    old, new = matrix[:, :-1], matrix[:, 1:]
+    had, has = ~np.isnan(old), ~np.isnan(new)
+    with np.errstate(invalid="ignore"):
+        revised = had & has & (np.abs(new - old) > tolerance * np.maximum(np.abs(old), 1.0))
+    kind = np.select([revised, ~had & has, had & ~has], ["revised", "added", "dropped"], "")
+    k, r = np.nonzero(kind != "")
+    return pd.DataFrame({
+        "series": keys.get_level_values(0)[k], "year": keys.get_level_values(1)[k], "kind": kind[k, r],
+        "old": old[k, r], "new": new[k, r], "from_release": labels[r], "to_release": labels[r + 1],
+    }, columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive of every fetched EIA workbook release, with revision diffs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("list", help="list archived releases per source")
+    p.add_argument("--url", help="only this source")
+    p = sub.add_parser("add", help="archive workbooks already on disk")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--url", required=True, help="source URL the workbooks were fetched from")
+    p = sub.add_parser("diff", help="report (series, year) values revised between releases")
+    p.add_argument("--country", default="China")
+    p.add_argument("--figure", type=int, default=6)
+    p.add_argument("--base-url", default=None)
+    p.add_argument("--all", action="store_true", help="also list added / dropped values, not just revisions")
+    p.add_argument("--output", help="write the revisions as CSV")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for url, history in read_manifest()["sources"].items():
+            if args.url and url != args.url:
+                continue
+            print(url)
+            for r in history:
+                print(f"  {r['fetched_at']}  {r['sha256'][:12]}  {r['bytes']:>9,} B" + (f"  etag={r['etag']}" if r.get("etag") else ""))
+    elif args.command == "add":
+        for path in args.paths:
+            r = add_file(path, args.url)
+            print(f"{'added' if r['new'] else 'unchanged':>9}  {r['sha256'][:12]}  {path}")
+    else:
+        from eia_fetch import figure_url
+
+        url = figure_url(args.country, args.figure, args.base_url)
+        obs = vintages(url, args.country, args.figure)
+        diff = vintage_diff(obs)
+        if not args.all:
+            diff = diff[diff["kind"] == "revised"]
+        print(f"{obs['release'].nunique()} releases of {url}")
+        print(diff.to_string(index=False) if not diff.empty else "No revisions.")
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            diff.to_csv(args.output, index=False)
+            print("Revisions saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from instrument import count, span
+
+
+class MappedFile(io.RawIOBase):
+    # seekable read-only file over a memory map (mmap itself lacks seekable(), which zipfile needs).
+    # The workbook is never loaded whole: read() copies just the requested range out of the map,
+    # readinto() fills the caller's buffer straight from a memoryview of it, and view() hands out
+    # zero-copy slices, which must be released before the file is closed.
+    def __init__(self, buf):
+        self._buf = buf
+        self._view = memoryview(buf)
+        self._pos = 0
+
+    def close(self) -> None:
+        # release the view first: an mmap with exported buffers cannot be closed
+        self._view.release()
+        super().close()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._buf)}[whence]
+        self._pos = max(base + offset, 0)
+        return self._pos
+
+    def _span(self, size) -> tuple:
+        end = len(self._buf) if size is None or size < 0 else min(self._pos + size, len(self._buf))
+        start, self._pos = self._pos, max(end, self._pos)
+        return start, max(end, start)
+
+    def view(self, size: int = -1) -> memoryview:
+        start, end = self._span(size)
+        return self._view[start:end]
+
+    def read(self, size: int = -1) -> bytes:
+        start, end = self._span(size)
+        return self._buf[start:end]
+
+    def readinto(self, b) -> int:
+        start, end = self._span(len(b))
+        b[:end - start] = self._view[start:end]
+        return end - start
+
+
+@contextmanager
+def mapped(path: str):
+    # the file as a MappedFile, for handing to pandas / openpyxl / zipfile
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        with MappedFile(buf) as mf:
+            yield mf
+
+
+def read_sheet_grids(xlsx_path: str) -> dict:
+    # one openpyxl pass over the workbook; results are shared for as long as the file is unchanged
+    st = os.stat(xlsx_path)
+    return _read_sheet_grids(os.path.realpath(xlsx_path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _read_sheet_grids(real_path: str, mtime_ns: int, size: int) -> dict:
+    # raw cell values exactly as read_excel hands them to its parser:
+    # empty cells are "", trailing empty rows trimmed, rows padded to the sheet width
+    count("workbook.parses")
+    with span("workbook.parse", path=real_path), mapped(real_path) as f:
+        sheets = pd.read_excel(f, sheet_name=None, engine="openpyxl",
+                               header=None, dtype=object, na_filter=False)
+    return {name: sheet.values.tolist() for name, sheet in sheets.items()}
+
+
+def read_sheet_grid(xlsx_path: str, sheet_name: str) -> list:
+    # single-sheet variant for when the table's location is already known
+    st = os.stat(xlsx_path)
+    return _read_sheet_grid(os.path.realpath(xlsx_path), st.st_mtime_ns, st.st_size, sheet_name)
+
+
+@lru_cache(maxsize=16)
+def _read_sheet_grid(real_path: str, mtime_ns: int, size: int, sheet_name: str) -> list:
+    count("workbook.parses")
+    with span("workbook.parse_sheet", path=real_path, sheet=sheet_name), mapped(real_path) as f:
+        sheet = pd.read_excel(f, sheet_name=sheet_name, engine="openpyxl",
+                              header=None, dtype=object, na_filter=False)
+    return sheet.values.tolist()
+
+
+def clear_grid_cache() -> None:
+    _read_sheet_grids.cache_clear()
+    _read_sheet_grid.cache_clear()
+
+
+def frame_from_grid(rows: list, header=0) -> pd.DataFrame:
+    # equivalent of pd.read_excel(..., header=header) evaluated against an in-memory grid
+    count("header.attempts")
+    if not rows:
+        return pd.DataFrame()
+    with TextParser([list(r) for r in rows], header=header, skip_blank_lines=False) as parser:
+        return parser.read()
+
+
+def numeric_block(frame: pd.DataFrame) -> np.ndarray:
+    # float matrix of the frame, non-numeric cells as NaN; object cells are coerced in a single call
+    values = frame.to_numpy()
+    if values.dtype != object:
+        try:
+            return values.astype(float)
+        except (TypeError, ValueError):
+            values = values.astype(object)
+    flat = pd.to_numeric(pd.Series(values.ravel(), dtype=object), errors="coerce")
+    return flat.to_numpy(dtype=float, na_value=np.nan).reshape(values.shape)
+
+
+def year_mask(block: np.ndarray, lo: int = 2000, hi: int = 2035) -> np.ndarray:
+    return (block >= lo) & (block <= hi)
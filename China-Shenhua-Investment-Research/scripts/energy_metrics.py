@@ -0,0 +1,187 @@
+import argparse
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+CAGR_WINDOWS = (3, 5, 10)
+ROLLING_WINDOW = 3
+# figure7 capacity sources that make up each figure6 generation series
+CAPACITY_FOR_GENERATION = {
+    "coal": ["coal"],
+    "natural_gas": ["natural_gas"],
+    "nuclear": ["nuclear"],
+    "hydro": ["hydro"],
+    "petroleum": ["oil"],
+    "non_hydro_renewables": ["solar", "wind", "other"],
+}
+HOURS_PER_YEAR = 8760.0
+
+
+def lookback(cagr_windows=CAGR_WINDOWS, rolling_window: int = ROLLING_WINDOW) -> int:
+    # how many earlier years any metric for year t reads
+    return max(max(cagr_windows, default=1), rolling_window - 1, 1)
+
+
+def panel(observations: pd.DataFrame, figure: int = 6) -> tuple:
+    # long store rows -> (entities, years, values): one row per (country, series), one column per
+    # calendar year with no gaps, NaN where EIA has no value
+    obs = observations[observations["figure"] == figure]
+    if obs.empty:
+        return pd.MultiIndex.from_tuples([], names=["country", "series"]), np.empty(0, dtype=int), np.empty((0, 0))
+    wide = obs.pivot_table(index=["country", "series"], columns="year", values="value", aggfunc="last")
+    years = np.arange(int(wide.columns.min()), int(wide.columns.max()) + 1)
+    wide = wide.reindex(columns=years)
+    return wide.index, years, wide.to_numpy(dtype=float)
+
+
+def _shift(values: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(values, np.nan)
+    if n < values.shape[1]:
+        out[:, n:] = values[:, :-n]
+    return out
+
+
+def _rolling(values: np.ndarray, window: int) -> tuple:
+    # mean and sample std over the trailing window; NaN unless all window years are present
+    filled = np.nan_to_num(values)
+    present = (~np.isnan(values)).astype(float)
+    pad = np.zeros((values.shape[0], 1))
+    c1 = np.cumsum(np.hstack([pad, filled]), axis=1)
+    c2 = np.cumsum(np.hstack([pad, filled * filled]), axis=1)
+    cn = np.cumsum(np.hstack([pad, present]), axis=1)
+    n_cols = values.shape[1]
+    mean = np.full_like(values, np.nan)
+    std = np.full_like(values, np.nan)
+    if window <= n_cols:
+        s1 = c1[:, window:] - c1[:, :-window]
+        s2 = c2[:, window:] - c2[:, :-window]
+        full = (cn[:, window:] - cn[:, :-window]) == window
+        m = s1 / window
+        var = np.maximum(s2 - window * m * m, 0.0) / max(window - 1, 1)
+        mean[:, window - 1:] = np.where(full, m, np.nan)
+        std[:, window - 1:] = np.where(full, np.sqrt(var), np.nan)
+    return mean, std
+
+
+def _share(entities: pd.MultiIndex, values: np.ndarray) -> np.ndarray:
+    # each series' share of its country's total in that year
+    codes, countries = pd.factorize(entities.get_level_values("country"))
+    totals = np.zeros((len(countries), values.shape[1]))
+    np.add.at(totals, codes, np.nan_to_num(values))
+    counted = np.zeros_like(totals)
+    np.add.at(counted, codes, ~np.isnan(values))
+    totals[counted == 0] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return values / totals[codes]
+
+
+def _metrics(entities: pd.MultiIndex, values: np.ndarray, cagr_windows, rolling_window: int) -> dict:
+    out = {"value": values, "share": _share(entities, values)}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["yoy"] = values / _shift(values, 1) - 1.0
+        for w in cagr_windows:
+            ratio = values / _shift(values, w)
+            out[f"cagr_{w}y"] = np.where(ratio > 0, ratio ** (1.0 / w), np.nan) - 1.0
+    out[f"rolling_mean_{rolling_window}y"], out[f"rolling_std_{rolling_window}y"] = _rolling(values, rolling_window)
+    return out
+
+
+def _first_change(old: np.ndarray, new: np.ndarray) -> int:
+    # first column where the new panel differs from the cached one (NaN-aware)
+    common = min(old.shape[1], new.shape[1])
+    same = (old[:, :common] == new[:, :common]) | (np.isnan(old[:, :common]) & np.isnan(new[:, :common]))
+    changed = np.flatnonzero(~same.all(axis=0))
+    return int(changed[0]) if changed.size else common
+
+
+def compute(entities: pd.MultiIndex, years: np.ndarray, values: np.ndarray, cache: Optional[dict] = None,
+            cagr_windows=CAGR_WINDOWS, rolling_window: int = ROLLING_WINDOW) -> dict:
+    # every metric for every (country, series) in one pass over the wide array. With a cache from an
+    # earlier call on the same entities and start year, only years from the first changed column on
+    # are recomputed, reading just the lookback columns before it. The cache dict is updated in place.
+    start = 0
+    reusable = (cache is not None and cache.get("years") is not None
+                and cache["entities"].equals(entities) and len(years) and cache["years"][0] == years[0]
+                and cache["params"] == (tuple(cagr_windows), rolling_window))
+    if reusable:
+        start = _first_change(cache["values"], values)
+    if reusable and start == len(years) == len(cache["years"]):
+        return cache["metrics"]
+    lo = max(0, start - lookback(cagr_windows, rolling_window))
+    tail = _metrics(entities, values[:, lo:], cagr_windows, rolling_window)
+    if start:
+        metrics = {k: np.hstack([cache["metrics"][k][:, :start], v[:, start - lo:]]) for k, v in tail.items()}
+    else:
+        metrics = tail
+    if cache is not None:
+        cache.update({"entities": entities, "years": years.copy(), "values": values.copy(), "metrics": metrics,
+                      "params": (tuple(cagr_windows), rolling_window), "recomputed_from": int(years[start]) if len(years) > start else None})
+    return metrics
+
+
+def capacity_factors(observations: pd.DataFrame, capacity_year: int = None) -> pd.DataFrame:
+    # generation (figure6, TWh) / (capacity (figure7, GW) x 8760 h). By default only years present in
+    # both are paired. figure7 is a single-year snapshot that usually runs ahead of figure6 (2024 capacity
+    # vs 2014-2023 generation), so capacity_year pairs that year's capacity with the latest generation
+    # year up to it; "year" is then the generation year and "capacity_year" says which capacity was used.
+    # Raises ValueError when both figures are present but no year pairs up.
+    gen = observations[observations["figure"] == 6]
+    cap = observations[observations["figure"] == 7]
+    source_to_series = {src: s for s, srcs in CAPACITY_FOR_GENERATION.items() for src in srcs}
+    cap = cap.assign(series=cap["series"].map(source_to_series)).dropna(subset=["series"])
+    cap = cap.groupby(["country", "series", "year"], as_index=False)["value"].sum(min_count=1)
+    cap = cap.rename(columns={"year": "capacity_year"})
+    if capacity_year is None:
+        gen = gen.assign(capacity_year=gen["year"])
+    else:
+        cap = cap[cap["capacity_year"] == capacity_year]
+        gen = gen[gen["year"] <= capacity_year]
+        gen = gen[gen["year"] == gen.groupby(["country", "series"])["year"].transform("max")]
+        gen = gen.assign(capacity_year=capacity_year)
+    merged = gen.merge(cap, on=["country", "series", "capacity_year"], suffixes=("_twh", "_gw"))
+    if merged.empty and (observations["figure"] == 6).any() and (observations["figure"] == 7).any():
+        gen_years = observations.loc[observations["figure"] == 6, "year"]
+        cap_years = observations.loc[observations["figure"] == 7, "year"]
+        raise ValueError(f"no overlap between generation years {gen_years.min()}-{gen_years.max()} and capacity "
+                         f"years {capacity_year or f'{cap_years.min()}-{cap_years.max()}'}; "
+                         "pass capacity_year to use the latest generation up to it")
+    merged["capacity_factor"] = merged["value_twh"] * 1000.0 / (merged["value_gw"] * HOURS_PER_YEAR)
+    return merged[["country", "series", "year", "capacity_year", "value_twh", "value_gw", "capacity_factor"]]
+
+
+def to_long(entities: pd.MultiIndex, years: np.ndarray, metrics: dict) -> pd.DataFrame:
+    # (country, series, year) rows with one column per metric
+    index = pd.MultiIndex.from_tuples([(c, s, y) for c, s in entities for y in years],
+                                      names=["country", "series", "year"])
+    return pd.DataFrame({k: v.ravel() for k, v in metrics.items()}, index=index).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derived energy-mix metrics from the EIA series store.")
+    parser.add_argument("--country", help="restrict to one country")
+    parser.add_argument("--capacity-year", type=int, help="pair this year's capacity with the latest generation up to it")
+    parser.add_argument("--output", help="write the long metrics table as CSV")
+    args = parser.parse_args()
+    from eia_store import read
+
+    observations = read(country=args.country)
+    entities, years, values = panel(observations)
+    table = to_long(entities, years, compute(entities, years, values))
+    pd.set_option("display.float_format", "{:,.3f}".format)
+    print(table[table["series"] == "coal"].to_string(index=False))
+    try:
+        factors = capacity_factors(observations, args.capacity_year)
+    except ValueError as e:
+        print("\nCapacity factors: none;", e)
+        factors = pd.DataFrame()
+    if not factors.empty:
+        print("\nCapacity factors:")
+        print(factors.to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print("Metrics saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()
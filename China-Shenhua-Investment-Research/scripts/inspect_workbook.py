@@ -0,0 +1,105 @@
+import argparse
+import os
+from itertools import islice
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "eia", "figure6_data.xlsx")
+KNOWN_LABELS = {"year", "coal", "natural gas", "nuclear", "hydro", "non-hydro renewables", "petroleum"}
+
+
+def open_streaming(xlsx_path: str):
+    # read-only workbooks stream rows from the sheet XML instead of building every cell up front
+    from openpyxl import load_workbook
+
+    return load_workbook(xlsx_path, read_only=True, data_only=True, keep_links=False)
+
+
+def sheet_dimensions(ws, scan: bool = False):
+    # declared size from the sheet's <dimension> tag; scanning streams the sheet when it is missing
+    rows, cols = ws.max_row, ws.max_column
+    if (rows is None or cols is None) and scan:
+        rows = cols = 0
+        for row in ws.iter_rows(values_only=True):
+            rows += 1
+            cols = max(cols, len(row))
+    return rows, cols
+
+
+def _as_year(v):
+    if isinstance(v, bool) or v is None:
+        return None
+    try:
+        val = float(v)
+    except (TypeError, ValueError):
+        return None
+    return int(val) if 2000 <= val <= 2035 else None
+
+
+def detect_label_header(rows, limit: int = 50):
+    # row mentioning "year" alongside at least 3 known series labels (long layout)
+    for i, row in enumerate(islice(rows, limit)):
+        vals = [str(v).strip().lower() for v in row if v is not None and v != ""]
+        if any("year" in v for v in vals):
+            if sum(1 for v in vals if any(k in v for k in KNOWN_LABELS)) >= 3:
+                return i, [str(v) for v in row if v is not None and v != ""]
+    return None
+
+
+def detect_year_header(rows, limit: int = 30, min_years: int = 5):
+    # row holding at least min_years year values (wide layout, as on the "Generation" sheet)
+    for i, row in enumerate(islice(rows, limit)):
+        years = [y for y in map(_as_year, row) if y is not None]
+        if len(years) >= min_years:
+            return i, years
+    return None
+
+
+def inspect(xlsx_path: str, sheet: str = None, preview_rows: int = 30, scan_rows: int = 50,
+            scan_dims: bool = False) -> None:
+    print("Excel path:", xlsx_path, "exists=", os.path.exists(xlsx_path))
+    wb = open_streaming(xlsx_path)
+    try:
+        print("Sheets:")
+        for ws in wb.worksheets:
+            rows, cols = sheet_dimensions(ws, scan=scan_dims)
+            print(f"  {ws.title!r}: rows={rows if rows is not None else '?'} cols={cols if cols is not None else '?'}")
+        names = [sheet] if sheet else wb.sheetnames
+        for name in names:
+            if name not in wb.sheetnames:
+                print(f"Sheet {name!r} not found.")
+                continue
+            ws = wb[name]
+            print(f"\n== {name} ==")
+            # only the first max(preview, scan) rows are ever pulled from the stream
+            head = [list(r) for r in ws.iter_rows(max_row=max(preview_rows, scan_rows), values_only=True)]
+            for i, row in enumerate(head[:preview_rows]):
+                while row and row[-1] is None:
+                    row = row[:-1]
+                print(f"{i:>4}  " + " | ".join("" if v is None else str(v) for v in row))
+            label_hit = detect_label_header(iter(head), limit=scan_rows)
+            if label_hit is not None:
+                print(f"Label header row: {label_hit[0]} -> {label_hit[1][:20]}")
+            else:
+                print(f"No label header row detected in first {scan_rows} rows.")
+            year_hit = detect_year_header(iter(head), limit=min(30, scan_rows))
+            if year_hit is not None:
+                print(f"Year header row: {year_hit[0]} -> {year_hit[1][0]}..{year_hit[1][-1]} ({len(year_hit[1])} years)")
+            else:
+                print("No year header row detected.")
+    finally:
+        wb.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect an Excel workbook without loading it into memory.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--sheet", help="only preview this sheet")
+    parser.add_argument("--rows", type=int, default=30, help="rows to preview per sheet")
+    parser.add_argument("--scan", type=int, default=50, help="rows searched for a header")
+    parser.add_argument("--scan-dims", action="store_true",
+                        help="stream whole sheets to size those without a declared dimension")
+    args = parser.parse_args()
+    inspect(args.path, sheet=args.sheet, preview_rows=args.rows, scan_rows=args.scan, scan_dims=args.scan_dims)
+
+
+if __name__ == "__main__":
+    main()
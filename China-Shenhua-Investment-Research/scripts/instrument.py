@@ -0,0 +1,109 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# tracing is off unless EIA_TRACE names an output file (or enable() is called);
+# when off, span() hands back a shared no-op context and count() returns immediately
+_enabled = False
+_trace_path = None
+_events = []
+_counters = {}
+_lock = threading.Lock()
+_t0 = time.perf_counter()
+_NULL = nullcontext()
+
+
+def enable(path: str = None) -> None:
+    # path=None collects events and counters in memory only
+    global _enabled, _trace_path
+    if not _enabled:
+        atexit.register(write_trace)
+    _enabled = True
+    _trace_path = path
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def counters() -> dict:
+    with _lock:
+        return dict(_counters)
+
+
+def reset() -> None:
+    # forget recorded events and counters, e.g. between benchmark cases
+    with _lock:
+        _events.clear()
+        _counters.clear()
+
+
+def peak_rss_kb() -> int:
+    if resource is None:
+        return 0
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if os.uname().sysname == "Darwin" else rss
+
+
+def _now_us() -> float:
+    return (time.perf_counter() - _t0) * 1e6
+
+
+@contextmanager
+def _span(name: str, args: dict):
+    start = _now_us()
+    try:
+        yield
+    finally:
+        end = _now_us()
+        event = {"name": name, "ph": "X", "ts": start, "dur": end - start,
+                 "pid": os.getpid(), "tid": threading.get_ident(),
+                 "args": dict(args, peak_rss_kb=peak_rss_kb())}
+        with _lock:
+            _events.append(event)
+
+
+def span(name: str, **args):
+    if not _enabled:
+        return _NULL
+    return _span(name, args)
+
+
+def count(name: str, n: int = 1) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+        _events.append({"name": name, "ph": "C", "ts": _now_us(), "pid": os.getpid(),
+                        "args": {name: _counters[name]}})
+
+
+def write_trace(path: str = None) -> str:
+    # Chrome trace format: load in chrome://tracing or Perfetto; totals are repeated under otherData
+    path = path or _trace_path
+    if not path:
+        return None
+    with _lock:
+        payload = {
+            "traceEvents": list(_events),
+            "displayTimeUnit": "ms",
+            "otherData": {"counters": dict(_counters), "peak_rss_kb": peak_rss_kb()},
+        }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    return path
+
+
+if os.environ.get("EIA_TRACE"):
+    enable(os.environ["EIA_TRACE"])
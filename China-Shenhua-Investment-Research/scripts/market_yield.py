@@ -0,0 +1,145 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+SYMBOLS = ("601088.SH", "01088.HK")
+CHUNK_ROWS = 1_000_000
+TRADING_DAYS = 252
+BANDS = (0.1, 0.5, 0.9)
+
+# Inputs (CSV or Parquet, any size):
+#   prices:    symbol, timestamp (or date), close    - daily or intraday bars, oldest first
+#   dividends: symbol, ex_date, dps                  - cash dividend per share in the listing's currency
+#   bond:      date, yield                           - e.g. 10y CGB, in percent
+# Price files are streamed chunk by chunk and reduced to one close per symbol and day as they
+# go, so memory is bounded by the chunk size plus the (small) daily series.
+
+
+def iter_chunks(path: str, columns: list = None, chunk_rows: int = CHUNK_ROWS):
+    # DataFrames of at most chunk_rows rows; only the requested columns are read
+    if path.endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        names = set(pf.schema_arrow.names)
+        cols = [c for c in columns if c in names] if columns else None
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=cols):
+            yield batch.to_pandas()
+    else:
+        usecols = (lambda c: c in columns) if columns else None
+        yield from pd.read_csv(path, usecols=usecols, chunksize=chunk_rows)
+
+
+def daily_closes(paths: list, symbols=SYMBOLS, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    # (date x symbol) last close of each day, built incrementally from streamed chunks
+    days = []
+    for path in paths:
+        for chunk in iter_chunks(path, ["symbol", "timestamp", "date", "close"], chunk_rows):
+            stamp = chunk["timestamp"] if "timestamp" in chunk else chunk["date"]
+            chunk = pd.DataFrame({"symbol": chunk["symbol"].astype(str),
+                                  "date": pd.to_datetime(stamp).dt.normalize(),
+                                  "close": pd.to_numeric(chunk["close"], errors="coerce")})
+            chunk = chunk[chunk["symbol"].isin(symbols)].dropna(subset=["close"])
+            # a day split across two chunks appears twice; the later chunk wins below
+            days.append(chunk.groupby(["date", "symbol"], sort=False)["close"].last())
+    if not days:
+        return pd.DataFrame(columns=list(symbols))
+    closes = pd.concat(days)
+    closes = closes[~closes.index.duplicated(keep="last")]
+    return closes.unstack("symbol").sort_index()
+
+
+def load_dividends(path: str, symbols=SYMBOLS) -> pd.DataFrame:
+    frames = [c for c in iter_chunks(path, ["symbol", "ex_date", "dps"])]
+    div = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["symbol", "ex_date", "dps"])
+    div = div.assign(symbol=div["symbol"].astype(str), ex_date=pd.to_datetime(div["ex_date"]).dt.normalize(),
+                     dps=pd.to_numeric(div["dps"], errors="coerce"))
+    return div[div["symbol"].isin(symbols)].dropna(subset=["dps"])
+
+
+def load_bond_yield(path: str) -> pd.Series:
+    frames = [c for c in iter_chunks(path, ["date", "yield"])]
+    bond = pd.concat(frames, ignore_index=True)
+    s = pd.Series(pd.to_numeric(bond["yield"], errors="coerce").to_numpy() / 100.0,
+                  index=pd.to_datetime(bond["date"]).dt.normalize(), name="bond_yield")
+    return s[~s.index.duplicated(keep="last")].sort_index().dropna()
+
+
+def trailing_dividends(dates: pd.DatetimeIndex, ex_dates: np.ndarray, dps: np.ndarray, days: int = 365) -> np.ndarray:
+    # sum of dividends with ex-date in (t - days, t] for every t, via cumulative sums and two searchsorted passes
+    order = np.argsort(ex_dates)
+    ex = ex_dates[order].astype("datetime64[ns]")
+    cum = np.concatenate([[0.0], np.cumsum(dps[order])])
+    t = dates.to_numpy(dtype="datetime64[ns]")
+    hi = np.searchsorted(ex, t, side="right")
+    lo = np.searchsorted(ex, t - np.timedelta64(days, "D"), side="right")
+    return cum[hi] - cum[lo]
+
+
+def yield_table(closes: pd.DataFrame, dividends: pd.DataFrame, bond: pd.Series = None,
+                window_years: int = 3, bands=BANDS) -> pd.DataFrame:
+    # long (date, symbol) table: close, TTM dividend, dividend yield, spread to bond, rolling bands
+    window = window_years * TRADING_DAYS
+    frames = []
+    for symbol in closes.columns:
+        close = closes[symbol].dropna()
+        if close.empty:
+            continue
+        div = dividends[dividends["symbol"] == symbol]
+        ttm = trailing_dividends(close.index, div["ex_date"].to_numpy(), div["dps"].to_numpy(dtype=float))
+        out = pd.DataFrame({"symbol": symbol, "close": close, "ttm_dividend": ttm}, index=close.index)
+        out["dividend_yield"] = out["ttm_dividend"] / out["close"]
+        if bond is not None and not bond.empty:
+            # bond yield as of each trading day (last published value, no look-ahead)
+            out["bond_yield"] = bond.reindex(out.index, method="ffill").to_numpy()
+            out["spread"] = out["dividend_yield"] - out["bond_yield"]
+        rolling = out["dividend_yield"].rolling(window, min_periods=window // 2)
+        for q in bands:
+            out[f"yield_p{int(q * 100)}"] = rolling.quantile(q)
+        # where today's yield sits in its own trailing window (1.0 = highest, i.e. cheapest)
+        out["yield_pct_rank"] = rolling.rank(pct=True)
+        if "spread" in out:
+            spread_roll = out["spread"].rolling(window, min_periods=window // 2)
+            for q in bands:
+                out[f"spread_p{int(q * 100)}"] = spread_roll.quantile(q)
+        frames.append(out)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames).rename_axis("date").reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling dividend yield and bond spread for 601088.SH / 01088.HK.")
+    parser.add_argument("--prices", action="append", required=True, help="price file (CSV/Parquet), repeatable")
+    parser.add_argument("--dividends", required=True, help="dividend records (CSV/Parquet)")
+    parser.add_argument("--bond", help="government bond yield series (CSV/Parquet, percent)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per streamed chunk (bounds memory)")
+    parser.add_argument("--window-years", type=int, default=3, help="window for percentile bands")
+    parser.add_argument("--output", help="write the daily table (.csv or .parquet)")
+    args = parser.parse_args()
+
+    closes = daily_closes(args.prices, chunk_rows=args.chunk_rows)
+    table = yield_table(closes, load_dividends(args.dividends), load_bond_yield(args.bond) if args.bond else None,
+                        window_years=args.window_years)
+    if table.empty:
+        print("No prices found for", ", ".join(SYMBOLS))
+        return
+    latest = table.groupby("symbol").tail(1).set_index("symbol")
+    cols = [c for c in ["date", "close", "dividend_yield", "bond_yield", "spread", "yield_p10", "yield_p50",
+                        "yield_p90", "yield_pct_rank"] if c in latest]
+    pd.set_option("display.float_format", "{:,.4f}".format)
+    print(f"{len(closes):,} trading days")
+    print(latest[cols].to_string())
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        if args.output.endswith((".parquet", ".pq")):
+            table.to_parquet(args.output, index=False)
+        else:
+            table.to_csv(args.output, index=False)
+        print("Yield table saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()
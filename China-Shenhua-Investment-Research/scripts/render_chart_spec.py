@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cjk_fonts import cjk_family, installed_families, report_missing_glyphs, summarised_glyph_warnings
+
+CHARTS_DIR = os.path.join(os.path.dirname(__file__), "..", "charts")
+
+
+def load_spec(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_pie(spec: dict, locale: str):
+    # figure, artists and layout are built once; locales only swap text afterwards
+    texts_spec = spec["locales"][locale]
+    fig = Figure(figsize=tuple(spec["figsize"]))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    wedges, texts, autotexts = ax.pie(spec["sizes"],
+                                      labels=texts_spec["labels"],
+                                      colors=spec["colors"],
+                                      autopct=spec["autopct"],
+                                      startangle=90,
+                                      textprops={'fontsize': 12},
+                                      pctdistance=0.8,
+                                      labeldistance=1.1)
+    title = ax.set_title(texts_spec["title"], fontsize=16, fontweight='bold', pad=20)
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(11)
+        autotext.set_weight('bold')
+    for text in texts:
+        text.set_fontsize(12)
+        text.set_weight('normal')
+    ax.axis('equal')
+    footer = fig.text(0.5, 0.02, texts_spec["source"],
+                      ha='center', fontsize=9, style='italic', color='gray')
+    fig.tight_layout()
+    return fig, {"labels": texts, "pct": autotexts, "title": title, "footer": footer}
+
+
+def apply_locale(artists: dict, texts_spec: dict) -> None:
+    family = texts_spec.get("font")
+    if family == "cjk":
+        family = cjk_family()
+    elif family:
+        family = installed_families([family] if isinstance(family, str) else family)
+    for text, label in zip(artists["labels"], texts_spec["labels"]):
+        text.set_text(label)
+    artists["title"].set_text(texts_spec["title"])
+    artists["footer"].set_text(texts_spec["source"])
+    if family:
+        for text in list(artists["labels"]) + list(artists["pct"]) + [artists["title"], artists["footer"]]:
+            text.set_fontfamily(family)
+
+
+def render_spec(spec: dict, locales: list = None, out_root: str = ".") -> list:
+    # emit every requested locale from one figure on the headless Agg canvas
+    locales = locales or list(spec["locales"])
+    if spec.get("kind", "pie") != "pie":
+        raise ValueError(f"Unsupported chart kind: {spec.get('kind')}")
+    missing = {}
+    for locale in locales:
+        texts_spec = spec["locales"][locale]
+        if texts_spec.get("font") == "cjk":
+            missing[locale] = report_missing_glyphs(texts_spec["labels"] + [texts_spec["title"], texts_spec["source"]], locale)
+    fig, artists = build_pie(spec, locales[0])
+    written = []
+    for locale in locales:
+        texts_spec = spec["locales"][locale]
+        apply_locale(artists, texts_spec)
+        out_path = os.path.join(out_root, texts_spec["output"])
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with summarised_glyph_warnings(missing.get(locale)):
+            fig.savefig(out_path, dpi=spec.get("dpi", 300), bbox_inches='tight',
+                        facecolor='white', edgecolor='none')
+        written.append(out_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a declarative chart spec for all of its locales.")
+    parser.add_argument("spec", nargs="?", default=os.path.join(CHARTS_DIR, "coal_demand_sources.json"))
+    parser.add_argument("--locale", action="append", help="render only these locales (repeatable)")
+    parser.add_argument("--out-root", default=".", help="directory the spec's output paths are relative to")
+    args = parser.parse_args()
+    for path in render_spec(load_spec(args.spec), args.locale, args.out_root):
+        print("Chart saved to:", path)
+
+
+if __name__ == "__main__":
+    main()
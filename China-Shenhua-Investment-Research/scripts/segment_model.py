@@ -0,0 +1,150 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# illustrative segment parameters for the integrated model in 02-company/business_model.md;
+# not company disclosures. Units: Mt, RMB/t, bn kWh, RMB/kWh, RMB bn
+SEGMENTS = {
+    "mining": {
+        "volume": 450.0,             # coal sold, external + internal
+        "cash_cost": 300.0,          # per tonne at the mine mouth
+    },
+    "transport": {
+        "capacity": 600.0,           # rail + port throughput at 100% utilization
+        "freight_rate": 55.0,        # per tonne hauled, charged to internal and external shippers alike
+        "fixed_cost": 18.0,
+        "variable_cost": 12.0,       # per tonne hauled
+    },
+    "power": {
+        "generation": 220.0,
+        "heat_rate": 0.30,           # t of coal per MWh (= Mt per bn kWh)
+        "other_cost": 0.09,          # per kWh, excluding fuel
+    },
+}
+# coal moving between segments; volumes in Mt, priced at (1 - discount) x market
+TRANSFERS = {
+    "mining_to_power": {"discount": 0.0},     # volume follows the power segment's fuel burn
+    "mining_to_transport": {"share": 0.8},    # share of mined coal hauled on the group's own rail
+}
+BASE_SCENARIO = {"coal_price": 560.0, "rail_utilization": 0.85, "tariff": 0.42}
+
+
+def evaluate(coal_price, rail_utilization, tariff, segments: dict = SEGMENTS, transfers: dict = TRANSFERS) -> dict:
+    # segment EBIT for every scenario at once; the three drivers broadcast against each other,
+    # so sparse meshgrid axes produce the full grid without materialising the inputs
+    coal_price = np.asarray(coal_price, dtype=float)
+    rail_utilization = np.asarray(rail_utilization, dtype=float)
+    tariff = np.asarray(tariff, dtype=float)
+    mining, transport, power = segments["mining"], segments["transport"], segments["power"]
+
+    fuel_burn = power["generation"] * power["heat_rate"]
+    internal_coal = min(fuel_burn, mining["volume"])
+    transfer_price = coal_price * (1.0 - transfers["mining_to_power"]["discount"])
+    external_coal = mining["volume"] - internal_coal
+
+    # internal coal is booked as mining revenue and power fuel cost at the transfer price
+    mining_ebit = (external_coal * coal_price + internal_coal * transfer_price
+                   - mining["volume"] * mining["cash_cost"]) / 1000.0
+    hauled = rail_utilization * transport["capacity"]
+    transport_ebit = hauled * (transport["freight_rate"] - transport["variable_cost"]) / 1000.0 - transport["fixed_cost"]
+    # coal bought from outside the group, if the plants burn more than the mines supply
+    market_fuel = (fuel_burn - internal_coal) * coal_price
+    power_ebit = (power["generation"] * (tariff - power["other_cost"])
+                  - (internal_coal * transfer_price + market_fuel) / 1000.0)
+    # internal freight on the group's own coal is revenue to transport and cost to mining;
+    # it nets to zero on consolidation and only moves profit between the segment lines
+    internal_freight = (mining["volume"] * transfers["mining_to_transport"]["share"]
+                        * transport["freight_rate"] / 1000.0)
+    mining_ebit = mining_ebit - internal_freight
+    consolidated = mining_ebit + transport_ebit + power_ebit
+    # a standalone miner sells the same tonnes at market with no downstream offset
+    pure_miner = (mining["volume"] * (coal_price - mining["cash_cost"])) / 1000.0
+    shape = np.broadcast(coal_price, rail_utilization, tariff).shape
+    return {
+        "mining": np.broadcast_to(mining_ebit, shape),
+        "transport": np.broadcast_to(transport_ebit, shape),
+        "power": np.broadcast_to(power_ebit, shape),
+        "internal_freight": np.broadcast_to(internal_freight, shape),
+        "consolidated": np.broadcast_to(consolidated, shape),
+        "pure_miner": np.broadcast_to(pure_miner, shape),
+    }
+
+
+def scenario_grid(coal_prices, rail_utilizations, tariffs, **kwargs) -> dict:
+    # every combination in one call; results are (prices, utilizations, tariffs) arrays
+    axes = np.meshgrid(np.asarray(coal_prices, dtype=float), np.asarray(rail_utilizations, dtype=float),
+                       np.asarray(tariffs, dtype=float), indexing="ij", sparse=True)
+    return evaluate(*axes, **kwargs)
+
+
+def volatility_comparison(results: dict, weights=None) -> pd.DataFrame:
+    # EBIT dispersion across the scenario grid, consolidated against the pure miner
+    rows = {}
+    w = None if weights is None else np.broadcast_to(weights, results["consolidated"].shape).ravel()
+    for key in ("consolidated", "pure_miner", "mining", "transport", "power"):
+        values = np.asarray(results[key]).ravel()
+        mean = np.average(values, weights=w)
+        std = np.sqrt(np.average((values - mean) ** 2, weights=w))
+        rows[key] = {"mean": mean, "std": std, "cv": std / abs(mean) if mean else np.nan,
+                     "p5": np.percentile(values, 5), "p95": np.percentile(values, 95)}
+    return pd.DataFrame(rows).T
+
+
+def sensitivity_table(row_axis: str, row_values, col_axis: str, col_values,
+                      metric: str = "consolidated", base: dict = BASE_SCENARIO, **kwargs) -> pd.DataFrame:
+    # EBIT (RMB bn) over two drivers with the third held at its base value
+    drivers = {k: np.asarray(v, dtype=float) for k, v in base.items()}
+    drivers[row_axis] = np.asarray(row_values, dtype=float)[:, None]
+    drivers[col_axis] = np.asarray(col_values, dtype=float)[None, :]
+    values = evaluate(drivers["coal_price"], drivers["rail_utilization"], drivers["tariff"], **kwargs)[metric]
+    return pd.DataFrame(values, index=pd.Index(row_values, name=row_axis), columns=pd.Index(col_values, name=col_axis))
+
+
+def coal_price_elasticity(base: dict = BASE_SCENARIO, step: float = 0.01, **kwargs) -> pd.Series:
+    # % change in each segment's EBIT for a 1% move in the coal price
+    lo = evaluate(base["coal_price"] * (1 - step), base["rail_utilization"], base["tariff"], **kwargs)
+    hi = evaluate(base["coal_price"] * (1 + step), base["rail_utilization"], base["tariff"], **kwargs)
+    mid = evaluate(base["coal_price"], base["rail_utilization"], base["tariff"], **kwargs)
+    return pd.Series({k: float((hi[k] - lo[k]) / (2 * step * mid[k])) if mid[k] else np.nan
+                      for k in ("consolidated", "pure_miner", "mining", "transport", "power")})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segment earnings of the coal-transport-power model over a scenario grid.")
+    parser.add_argument("--prices", type=int, default=100, help="coal price points between 350 and 900 RMB/t")
+    parser.add_argument("--utilizations", type=int, default=100, help="rail utilization points between 60% and 100%")
+    parser.add_argument("--tariffs", type=int, default=100, help="power tariff points between 0.35 and 0.50 RMB/kWh")
+    parser.add_argument("--output-dir", help="write the sensitivity tables as CSV here")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = scenario_grid(np.linspace(350, 900, args.prices), np.linspace(0.6, 1.0, args.utilizations),
+                            np.linspace(0.35, 0.50, args.tariffs))
+    n = args.prices * args.utilizations * args.tariffs
+    print(f"{n:,} scenarios in {time.perf_counter() - start:.3f}s\n")
+    pd.set_option("display.float_format", "{:,.2f}".format)
+    print("EBIT across the grid (RMB bn):")
+    print(volatility_comparison(results), "\n")
+    print("Coal price elasticity of EBIT at the base scenario:")
+    print(coal_price_elasticity(), "\n")
+
+    prices = [400, 500, 560, 650, 800]
+    tables = {
+        "consolidated_price_x_tariff": sensitivity_table("coal_price", prices, "tariff", [0.38, 0.40, 0.42, 0.44, 0.46]),
+        "consolidated_price_x_utilization": sensitivity_table("coal_price", prices, "rail_utilization", [0.7, 0.8, 0.85, 0.9, 1.0]),
+        "pure_miner_price_x_tariff": sensitivity_table("coal_price", prices, "tariff", [0.38, 0.40, 0.42, 0.44, 0.46],
+                                                       metric="pure_miner"),
+    }
+    for name, table in tables.items():
+        print(name.replace("_", " ") + ":")
+        print(table, "\n")
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            table.to_csv(os.path.join(args.output_dir, f"{name}.csv"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import difflib
+import re
+from functools import lru_cache
+
+# Alias tables: series key -> header spellings, most preferred first. English spellings are the
+# EIA workbook headers; Chinese ones cover NBS / CEC / NEA domestic statistics.
+# NBS publishes thermal (火电) rather than coal-fired generation; thermal is overwhelmingly coal, so it
+# is read as the coal series (a source should not report both).
+GENERATION_SERIES = {
+    "coal": ["coal", "thermal", "thermal power", "coal-fired", "煤电", "燃煤发电", "燃煤", "煤炭", "火电", "火力发电",
+             "火力"],
+    "natural_gas": ["natural gas", "gas", "gas-fired", "gas turbine", "气电", "燃气发电", "燃气", "天然气", "天然气发电"],
+    "nuclear": ["nuclear", "核电", "核能发电", "核能"],
+    "hydro": ["hydro", "hydropower", "hydroelectric", "水电", "水力发电"],
+    "non_hydro_renewables": ["non-hydro renewables", "other renewables", "renewables (non-hydro)", "solar", "wind",
+                             "solar pv", "solar photovoltaic",
+                             "非水可再生能源", "其他可再生能源", "风电", "风能", "风力发电", "风力", "太阳能发电", "太阳能",
+                             "光伏", "光伏发电", "生物质发电", "生物质", "地热发电", "地热"],
+    "petroleum": ["petroleum", "petroleum-fired", "petroleum and other liquids", "燃油发电", "石油"],
+}
+CAPACITY_SOURCES = {
+    "coal": ["coal", "煤电", "燃煤"],
+    "natural_gas": ["natural gas", "gas", "气电", "燃气", "天然气"],
+    "oil": ["oil", "petroleum", "燃油", "石油"],
+    "nuclear": ["nuclear", "核电"],
+    "hydro": ["hydro", "hydropower", "hydroelectric", "水电"],
+    "solar": ["solar", "太阳能", "光伏", "太阳能发电"],
+    "wind": ["wind", "风电", "风能"],
+    "storage": ["storage", "pumped-storage", "battery", "储能", "抽水蓄能"],
+    "other": ["other", "其他"],
+}
+YEAR_ALIASES = ["year", "years", "年", "年份", "年度"]
+
+_NON_ALPHA = re.compile(r"[^a-z]")
+_NON_CJK = re.compile(r"[^一-鿿]")
+_UNITS = re.compile(r"[（(][^)）]*[)）]|\b(twh|gwh|gw|mw|bkwh|billion kwh|million kw)\b|亿千瓦时|万千瓦")
+
+
+@lru_cache(maxsize=4096)
+def normalize(header: str) -> str:
+    # letters only, lower-cased (the historical EIA rule, so "Natural Gas " == "natural gas");
+    # headers whose only Latin letters are units ("风电（GW）") keep their CJK characters instead
+    text = header.strip().lower()
+    if not _NON_ALPHA.sub("", _UNITS.sub(" ", text)):
+        cjk = _NON_CJK.sub("", _UNITS.sub(" ", text))
+        if cjk:
+            return cjk
+    return _NON_ALPHA.sub("", text)
+
+
+def compile_table(table: dict) -> dict:
+    # key -> normalized aliases in preference order, plus the reverse alias -> key hash index
+    by_key = {key: [normalize(a) for a in aliases] for key, aliases in table.items()}
+    index = {}
+    for key, aliases in by_key.items():
+        for alias in aliases:
+            index.setdefault(alias, key)
+    return {"by_key": by_key, "index": index}
+
+
+GENERATION = compile_table(GENERATION_SERIES)
+CAPACITY = compile_table(CAPACITY_SOURCES)
+YEAR = frozenset(normalize(a) for a in YEAR_ALIASES)
+
+
+def header_index(columns, keep: str = "last") -> dict:
+    # normalized header -> column label, each header normalized once per frame;
+    # with duplicates, keep="last" or "first" decides which column a header resolves to
+    index = {}
+    for c in columns:
+        n = normalize(str(c))
+        if keep == "last" or n not in index:
+            index[n] = c
+    return index
+
+
+def year_column(columns):
+    # first column whose header is a year alias, else None. CJK aliases must be the whole header,
+    # so year-labelled data columns ("2023年", "2024年度") are not taken for the year column
+    for c in columns:
+        text = str(c).strip().lower()
+        key = normalize(text)
+        if key in YEAR and (key.isascii() or key == text):
+            return c
+    return None
+
+
+def match_columns(columns, compiled: dict, keep: str = "last", headers: dict = None) -> dict:
+    # key -> matching columns in alias-preference order; one hash lookup per (key, alias)
+    headers = header_index(columns, keep) if headers is None else headers
+    matches = {}
+    for key, aliases in compiled["by_key"].items():
+        cols = [headers[a] for a in aliases if a in headers]
+        if cols:
+            matches[key] = cols
+    return matches
+
+
+def _strip_units(header: str) -> str:
+    return _UNITS.sub(" ", header.strip().lower())
+
+
+@lru_cache(maxsize=4096)
+def _fuzzy(header: str, table: str, cutoff: float) -> str:
+    compiled = GENERATION if table == "generation" else CAPACITY
+    key = normalize(_strip_units(header))
+    if key in compiled["index"]:
+        return compiled["index"][key]
+    close = difflib.get_close_matches(key, list(compiled["index"]), n=1, cutoff=cutoff)
+    return compiled["index"][close[0]] if close else None
+
+
+def resolve(header, table: str = "generation", fuzzy: bool = False, cutoff: float = 0.85):
+    # series key for one header, or None. Exact matches are a dict lookup; fuzzy matching drops
+    # units ("Coal (TWh)", "风电（万千瓦）") and tolerates near-miss spellings, memoized per header
+    compiled = GENERATION if table == "generation" else CAPACITY
+    key = compiled["index"].get(normalize(str(header)))
+    if key is None and fuzzy:
+        key = _fuzzy(str(header), table, cutoff)
+    return key
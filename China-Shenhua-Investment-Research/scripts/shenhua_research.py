@@ -0,0 +1,242 @@
+import argparse
+import calendar
+import json
+import os
+import sys
+import time
+import zipfile
+from xml.etree import ElementTree
+
+# Single entry point for the research pipeline. Only the standard library is imported here;
+# pandas, matplotlib, openpyxl and requests are imported inside the subcommands that use them,
+# so cheap checks (freshness, sheet listing, --help) start in tens of milliseconds.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPTS_DIR, "..", "data", "eia")
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def _workbook_path(country: str, figure: int) -> str:
+    # same layout as eia_fetch.figure_path, without importing requests
+    if country == "China":
+        return os.path.join(DATA_DIR, f"figure{figure}_data.xlsx")
+    return os.path.join(DATA_DIR, country, f"figure{figure}_data.xlsx")
+
+
+def _parse_figures(spec: str) -> list:
+    figures = []
+    for part in spec.split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            figures.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            figures.append(int(part))
+    return figures
+
+
+def sheet_names(xlsx_path: str) -> list:
+    # sheet titles straight from xl/workbook.xml; no spreadsheet library involved
+    with zipfile.ZipFile(xlsx_path) as zf:
+        root = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    return [s.get("name") for s in root.iter(f"{SHEET_NS}sheet")]
+
+
+def freshness(xlsx_path: str, max_age_hours: float = None) -> dict:
+    # what the last fetch recorded for this workbook (see eia_fetch's .meta.json sidecar)
+    status = {"path": os.path.normpath(xlsx_path), "exists": os.path.exists(xlsx_path)}
+    if not status["exists"]:
+        status["fresh"] = False
+        return status
+    st = os.stat(xlsx_path)
+    status.update({"bytes": st.st_size, "age_hours": (time.time() - st.st_mtime) / 3600})
+    try:
+        with open(xlsx_path + ".meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        meta = {}
+    status.update({k: meta[k] for k in ("etag", "last_modified", "fetched_at", "checked_at") if meta.get(k)})
+    # age counts from the last time the server confirmed this copy, else from the file itself
+    checked = meta.get("checked_at") or meta.get("fetched_at")
+    if checked:
+        try:
+            status["age_hours"] = (time.time() - calendar.timegm(time.strptime(checked, "%Y-%m-%dT%H:%M:%SZ"))) / 3600
+        except ValueError:
+            pass
+    status["fresh"] = max_age_hours is None or status["age_hours"] <= max_age_hours
+    return status
+
+
+def cmd_fetch(args) -> int:
+    from eia_fetch import build_manifest, fetch_manifest
+
+    results = fetch_manifest(build_manifest(args.countries.split(","), _parse_figures(args.figures), args.base_url),
+                             max_workers=args.workers)
+    for r in results:
+        print(f"{r['status']:>12}  {r['url']}" + (f"  ({r['error']})" if r["status"] == "error" else ""))
+    return 1 if any(r["status"] == "error" for r in results) else 0
+
+
+def cmd_inspect(args) -> int:
+    paths = args.paths or [_workbook_path(args.country, f) for f in _parse_figures(args.figures)]
+    if args.fresh:
+        stale = 0
+        for path in paths:
+            s = freshness(path, args.max_age)
+            stale += not s["fresh"]
+            if not s["exists"]:
+                print(f"missing  {s['path']}")
+                continue
+            print(f"{'fresh' if s['fresh'] else 'stale':>7}  {s['path']}  {s['age_hours']:.1f}h old"
+                  + (f"  etag={s['etag']}" if "etag" in s else ""))
+        return 1 if stale else 0
+    if args.sheets:
+        for path in paths:
+            print(os.path.normpath(path) + ":", ", ".join(sheet_names(path)))
+        return 0
+    from inspect_workbook import inspect
+
+    for path in paths:
+        inspect(path, sheet=args.sheet, preview_rows=args.rows, scan_rows=args.scan)
+    return 0
+
+
+def cmd_parse(args) -> int:
+    from eia_cache import load_cached
+
+    loaders = {}
+    if 6 in args.figure_list:
+        from create_eia_generation_timeseries import load_generation_table
+
+        loaders[6] = ("figure6", load_generation_table)
+    if 7 in args.figure_list:
+        from create_eia_capacity_2024 import load_capacity_table
+
+        loaders[7] = ("figure7", load_capacity_table)
+    for figure, (kind, loader) in loaders.items():
+        path = _workbook_path(args.country, figure)
+        table = load_cached(path, kind, loader)
+        print(f"{args.country} figure{figure}: {len(table)} rows")
+        print(table.to_string(index=False))
+        if args.store:
+            from eia_store import ingest
+
+            print(f"Stored {ingest(args.country, figure, path)} new observations")
+    return 0
+
+
+def cmd_render(args) -> int:
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    if args.spec:
+        from render_chart_spec import load_spec, render_spec
+
+        for path in render_spec(load_spec(args.spec), args.locale, args.out_root):
+            print("Chart saved to:", path)
+        return 0
+    if args.jobs:
+        from chart_render import render_batch
+
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            results = render_batch(json.load(f), args.workers)
+    else:
+        from eia_batch import run_batch
+
+        results = run_batch(args.countries.split(","), _parse_figures(args.figures), workers=args.workers, fetch=False)
+    failed = [r for r in results if r["status"] != "ok"]
+    for r in results:
+        print(f"{r['status']:>5}  {r['output']}" + (f"  ({r['error']})" if r["status"] != "ok" else ""))
+    return 1 if failed else 0
+
+
+def cmd_build(args) -> int:
+    from build_charts import build
+
+    return 0 if build(args.targets, force=args.force, jobs=args.jobs, dry_run=args.dry_run) else 1
+
+
+def cmd_watch(args) -> int:
+    from chart_watch import watch
+
+    try:
+        watch(args.targets)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_report(args) -> int:
+    from compile_report import compile_report
+
+    r = compile_report(jobs=args.jobs, force=args.force, pdf=args.pdf)
+    print(f"{r['sections_rebuilt']}/{r['sections']} sections and {r['images_rebuilt']}/{r['images']} images rebuilt "
+          f"in {r['elapsed'] * 1e3:.0f} ms; payload {r['payload_bytes'] / 1024:,.0f} KiB")
+    print("Report saved to:", r["index"])
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="shenhua-research", description="China Shenhua research data and chart pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fetch", help="refresh EIA workbooks (conditional GET)")
+    p.add_argument("--countries", default="China")
+    p.add_argument("--figures", default="6,7")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--base-url", default=None)
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("inspect", help="check or preview downloaded workbooks")
+    p.add_argument("paths", nargs="*", help="workbooks (default: the country's figure workbooks)")
+    p.add_argument("--country", default="China")
+    p.add_argument("--figures", default="6,7")
+    p.add_argument("--fresh", action="store_true", help="only report download age / ETag; exit 1 if stale or missing")
+    p.add_argument("--max-age", type=float, default=None, metavar="HOURS", help="age after which --fresh reports stale")
+    p.add_argument("--sheets", action="store_true", help="only list sheet names")
+    p.add_argument("--sheet", help="only preview this sheet")
+    p.add_argument("--rows", type=int, default=30)
+    p.add_argument("--scan", type=int, default=50)
+    p.set_defaults(func=cmd_inspect)
+
+    p = sub.add_parser("parse", help="parse workbooks into tidy tables (through the parse cache)")
+    p.add_argument("--country", default="China")
+    p.add_argument("--figures", default="6,7")
+    p.add_argument("--store", action="store_true", help="also append the observations to the series store")
+    p.set_defaults(func=cmd_parse)
+
+    p = sub.add_parser("render", help="render charts from workbooks, a chart spec or a jobs file")
+    p.add_argument("--countries", default="China")
+    p.add_argument("--figures", default="6,7")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--spec", help="render a chart spec (charts/*.json) instead")
+    p.add_argument("--locale", action="append", help="with --spec: only these locales")
+    p.add_argument("--out-root", default=".", help="with --spec: directory output paths are relative to")
+    p.add_argument("--jobs", help="render a chart_render jobs file instead")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("build", help="re-render charts whose inputs changed")
+    p.add_argument("targets", nargs="*")
+    p.add_argument("--force", action="store_true")
+    p.add_argument("-j", "--jobs", type=int, default=None)
+    p.add_argument("--dry-run", action="store_true")
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser("watch", help="keep charts up to date while editing scripts, data or chart specs")
+    p.add_argument("targets", nargs="*")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("report", help="compile the markdown sections into one HTML report")
+    p.add_argument("-j", "--jobs", type=int, default=None)
+    p.add_argument("--force", action="store_true")
+    p.add_argument("--pdf", action="store_true", help="also write report.pdf (needs weasyprint)")
+    p.set_defaults(func=cmd_report)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = make_parser().parse_args(argv)
+    if hasattr(args, "figures"):
+        args.figure_list = _parse_figures(args.figures)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import os
+import sys
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import create_eia_generation_timeseries as gen  # noqa: E402
+import eia_layouts  # noqa: E402
+
+SERIES = ["Coal", "Natural gas", "Nuclear", "Hydroelectric", "Non-hydro renewables", "Petroleum"]
+
+
+def write_figure6(path, years, revised: float = 0.0) -> None:
+    # a title block above a Year x series table, as in the EIA download
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["Figure 6. China's electricity generation by source"])
+    ws.append(["Source: U.S. Energy Information Administration"])
+    ws.append(["Year"] + SERIES)
+    for i, year in enumerate(years):
+        ws.append([year] + [1000.0 + 10 * i + j + (revised if i == 0 else 0.0) for j in range(len(SERIES))])
+    wb.save(path)
+
+
+def test_new_release_with_same_layout_hits_the_registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(eia_layouts, "REGISTRY_PATH", str(tmp_path / "layouts.json"))
+    old, new = tmp_path / "old.xlsx", tmp_path / "new.xlsx"
+    write_figure6(old, range(2014, 2023))
+    write_figure6(new, range(2014, 2024), revised=12.5)  # one more year and a revised value
+    assert eia_layouts.workbook_fingerprint(str(old)) == eia_layouts.workbook_fingerprint(str(new))
+
+    gen.load_figure6_dataframe(str(old))
+    assert eia_layouts.lookup("figure6", eia_layouts.workbook_fingerprint(str(new))) is not None
+
+    # a registry hit reads just the recorded sheet; the full-workbook search must not run
+    def no_search(path):
+        raise AssertionError("layout search ran despite a registry hit")
+
+    monkeypatch.setattr(gen, "read_sheet_grids", no_search)
+    df = gen.load_figure6_dataframe(str(new))
+    assert len(df) == 10
+
+
+def test_structural_change_changes_fingerprint(tmp_path):
+    a, b = tmp_path / "a.xlsx", tmp_path / "b.xlsx"
+    write_figure6(a, range(2014, 2024))
+    write_figure6(b, range(2014, 2024))
+    from openpyxl import load_workbook
+
+    wb = load_workbook(b)
+    wb["Data"].insert_rows(1)
+    wb.save(b)
+    assert eia_layouts.workbook_fingerprint(str(a)) != eia_layouts.workbook_fingerprint(str(b))
@@ -0,0 +1,84 @@
+import os
+import re
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "scripts")
+HEAVY = {"pandas", "matplotlib", "requests", "openpyxl", "numpy"}
+BUDGET_MS = 250  # the stdlib-only entry point imports in ~40 ms; pandas alone costs several times this
+
+# `python -X importtime` prints one "import time: self | cumulative | name" line per module to stderr;
+# top-level imports are the unindented names, and their cumulative times add up to the whole import cost.
+_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def _imports(*args: str) -> tuple:
+    # (module names, total import microseconds) of one fresh interpreter running args
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=SCRIPTS_DIR,
+                          capture_output=True, text=True, timeout=60)
+    names, total = set(), 0
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            names.add(m.group(3).split(".")[0])
+            total += int(m.group(1)) if not m.group(2) else 0
+    return names, total
+
+
+def test_inspect_fresh_stays_stdlib_only(tmp_path):
+    names, total = _imports("shenhua_research.py", "inspect", "--fresh", str(tmp_path / "figure6_data.xlsx"))
+    assert not names & HEAVY, f"inspect --fresh imported {sorted(names & HEAVY)}"
+    assert total / 1000 < BUDGET_MS, f"inspect --fresh spent {total / 1000:.0f} ms importing (budget {BUDGET_MS} ms)"
+
+
+def test_help_stays_stdlib_only():
+    names, total = _imports("shenhua_research.py", "--help")
+    assert not names & HEAVY, f"--help imported {sorted(names & HEAVY)}"
+    assert total / 1000 < BUDGET_MS
+
+
+def test_fetch_module_does_not_load_pandas():
+    # fetching needs requests, but archiving a release must not drag in the parsing stack
+    names, _ = _imports("-c", "import eia_fetch")
+    assert "requests" in names
+    assert not names & {"pandas", "numpy", "matplotlib", "openpyxl"}, sorted(names & {"pandas", "numpy"})
+
+
+def test_fetch_round_trip_stays_free_of_pandas(tmp_path):
+    # a real download then a conditional re-fetch against a local server: the 200 path archives the
+    # release and writes the .meta.json sidecar, the second request comes back 304, and pandas never loads
+    import functools
+    import json
+    import threading
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    served = tmp_path / "served"
+    served.mkdir()
+    (served / "figure6_data.xlsx").write_bytes(b"PK\x03\x04" + b"\0" * 64)
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(served))
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/figure6_data.xlsx"
+        dest = tmp_path / "out" / "figure6_data.xlsx"
+        script = (
+            "import json, sys, eia_fetch\n"
+            f"m = [({url!r}, {str(dest)!r})]\n"
+            f"kw = dict(vault_dir={str(tmp_path / 'vault')!r}, retries=0)\n"
+            "first = eia_fetch.fetch_manifest(m, **kw)[0]\n"
+            "second = eia_fetch.fetch_manifest(m, **kw)[0]\n"
+            "print(json.dumps([first, second, 'pandas' in sys.modules]))\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", script], cwd=SCRIPTS_DIR,
+                              capture_output=True, text=True, timeout=60)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert proc.returncode == 0, proc.stderr
+    first, second, pandas_loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert first["status"] == "downloaded", first
+    assert second["status"] == "not_modified", second
+    meta = json.loads((tmp_path / "out" / "figure6_data.xlsx.meta.json").read_text())
+    assert meta["last_modified"] and meta["sha256"]
+    assert not pandas_loaded
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import province_stats  # noqa: E402
+
+# one month of an NBS-style extract: Chinese headers, NBS source spellings, 亿千瓦时 / 万吨,
+# a duplicate province header and a "--" placeholder
+NBS_CSV = """地区,省份,月份,指标,电源类型,当月值
+山东,山东省,2024年1月,发电量,火电,500
+山东,山东省,2024年1月,发电量,燃气,20
+山东,山东省,2024年1月,发电量,核能,30
+山东,山东省,2024年1月,发电量,水电,10
+山东,山东省,2024年1月,发电量,风力,60
+山东,山东省,2024年1月,发电量,光伏,40
+山东,山东省,2024年1月,发电量,生物质发电,10
+内蒙古,内蒙古自治区,2024年1月,发电量,风电,--
+内蒙古,内蒙古自治区,2024年1月,原煤产量,,10000
+"""
+
+
+def test_nbs_labels_roll_up_to_eia_series(tmp_path):
+    path = tmp_path / "nbs_2024_01.csv"
+    path.write_text(NBS_CSV, encoding="utf-8")
+    report = province_stats.update([str(path)], unit="亿千瓦时", coal_unit="万吨", store_dir=str(tmp_path / "store"))
+    assert report[0]["rows"] == 9
+    assert report[0]["dropped"] == 1  # only the "--" placeholder
+    rollup = province_stats.load_rollup(str(tmp_path / "store"))
+    gen = province_stats.monthly(rollup, "national", "generation").loc["2024-01"]
+    assert gen["coal"] == pytest.approx(50.0)
+    assert gen["natural_gas"] == pytest.approx(2.0)
+    assert gen["nuclear"] == pytest.approx(3.0)
+    assert gen["hydro"] == pytest.approx(1.0)
+    assert gen["non_hydro_renewables"] == pytest.approx(11.0)
+    coal = province_stats.monthly(rollup, "national", "coal_output").loc["2024-01"]
+    assert coal["total"] == pytest.approx(100.0)